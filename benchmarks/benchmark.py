@@ -0,0 +1,374 @@
+# benchmarks/benchmark.py
+"""Banco de pruebas de rendimiento de los caminos críticos.
+
+Mide:
+  * generar_tabla_amortizacion  (12 a 480 meses, 0 a 50 aportes; pesos y UVR)
+  * simular_lote                (1000 créditos por sistema de amortización)
+  * calcular_indicadores        (modules/indicators.py e indicators.py de la raíz)
+  * leer_escenarios_desde_excel (libros sintéticos)
+  * exportar_excel / exportar_csv
+  * fusionar_pdfs (desde archivos y renderizando en memoria)
+  * totales_cartera y la página visible de la tabla (modules/viewer.py)
+
+Cada caso se repite varias veces y se guarda la mediana y el mínimo por
+llamada en un JSON.  Si se pasa una línea base, se compara caso a caso y el
+proceso termina con código 1 cuando alguno es más lento que la base por más
+del umbral.
+
+Los tiempos solo son comparables en el mismo entorno: la línea base guarda
+las versiones de Python/NumPy/pandas, el modelo de CPU y los núcleos, y si
+no coinciden con los de esta corrida no se compara (código 2).  Cada equipo
+o runner de CI debe grabar su propia línea base con ``--guardar-baseline``;
+la que está en el repositorio sirve solo en la máquina donde se grabó.
+
+Uso:
+    python benchmarks/benchmark.py                          # mide y compara con baseline.json
+                                                            # (resultados en benchmarks/resultados.json)
+    python benchmarks/benchmark.py --salida resultados.json --umbral 0.3
+    python benchmarks/benchmark.py --guardar-baseline       # actualiza baseline.json
+    python benchmarks/benchmark.py --filtro amortizacion --rapido
+    python benchmarks/benchmark.py --forzar                 # compara aunque cambie el entorno
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime
+from itertools import cycle
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+RAIZ = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(RAIZ))
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+
+import indicators as indicadores_raiz
+from modules.amortization import generar_tabla_amortizacion
+from modules.batch import simular_lote
+from modules.exporter import exportar_csv, exportar_excel
+from modules.indicators import calcular_indicadores
+from modules.inputs import leer_escenarios_desde_excel
+from modules.pdf_generator import generar_pdf_resumen, renderizar_pdf_resumen
+from modules.pdf_merge import fusionar_pdfs
+from modules.systems import SISTEMAS
+from modules.totals import totales_cartera
+from modules.viewer import pagina_tabla
+
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+# Claves de "meta" que deben coincidir para comparar con la línea base
+ENTORNO = ("python", "numpy", "pandas", "procesador", "nucleos")
+RESULTADOS = Path(__file__).resolve().parent / "resultados.json"
+
+# Cada caso: nombre → función sin argumentos que prepara los datos y devuelve
+# la llamada a medir.
+Caso = Tuple[str, Callable[[], Callable[[], object]]]
+
+
+# =========================
+# Datos sintéticos
+# =========================
+
+def _escenario(plazo: int, n_aportes: int, semilla: int = 0) -> dict:
+    rng = np.random.default_rng(semilla)
+    meses = np.sort(rng.choice(np.arange(1, plazo + 1), size=min(n_aportes, plazo), replace=False))
+    return {
+        "nombre": f"Escenario {plazo}m {n_aportes}a",
+        "monto": 200_000_000.0,
+        "tasa": 0.1095,
+        "plazo": plazo,
+        "seguro": 50_000.0,
+        "fecha_inicio": date(2025, 5, 1),
+        "aportes": [
+            {"mes": int(m), "monto": 1_000_000.0, "modo": "cuota" if i % 2 else "plazo"}
+            for i, m in enumerate(meses)
+        ],
+    }
+
+
+def _libro_sintetico(ruta: Path, n_escenarios: int) -> None:
+    wb = Workbook()
+    ws = wb.active
+    ws.append(["Nombre", "Monto", "Tasa", "Plazo", "Seguro", "Fecha inicio",
+               "mes_aporte_1", "monto_aporte_1", "modo_aporte_1",
+               "mes_aporte_2", "monto_aporte_2", "modo_aporte_2"])
+    for i in range(n_escenarios):
+        ws.append([f"Escenario {i}", 150_000_000 + i * 1_000_000, 0.1095, 240, 50_000,
+                   datetime(2025, 5, 1), 12, 5_000_000, "plazo", 24, 3_000_000, "cuota"])
+    wb.save(ruta)
+
+
+def _tablas_distintas(plazo: int, cantidad: int = 300) -> List[pd.DataFrame]:
+    tablas = []
+    for i in range(cantidad):
+        esc = _escenario(plazo, 5, semilla=i)
+        esc["monto"] += i * 100_000
+        tablas.append(generar_tabla_amortizacion(esc))
+    return tablas
+
+
+# =========================
+# Casos
+# =========================
+
+def _casos(carpeta: Path) -> List[Caso]:
+    casos: List[Caso] = []
+
+    for plazo in (12, 60, 120, 240, 360, 480):
+        for n_aportes in (0, 5, 20, 50):
+            if n_aportes > plazo:
+                continue
+            def preparar(plazo=plazo, n_aportes=n_aportes):
+                esc = _escenario(plazo, n_aportes)
+                return lambda: generar_tabla_amortizacion(dict(esc))
+            casos.append((f"amortizacion/plazo={plazo}/aportes={n_aportes}", preparar))
+
+    # Mismo crédito en UVR: la conversión a pesos es una búsqueda vectorizada
+    for plazo in (120, 240, 360):
+        def preparar_uvr(plazo=plazo):
+            esc = dict(_escenario(plazo, 5), denominacion="uvr", tasa=0.07,
+                       inflacion=0.05, uvr_inicial=380.0)
+            return lambda: generar_tabla_amortizacion(dict(esc))
+        casos.append((f"amortizacion_uvr/plazo={plazo}/aportes=5", preparar_uvr))
+
+    # Cartera completa por sistema: una pasada de arreglos cada uno
+    for sistema in SISTEMAS:
+        def preparar_lote(sistema=sistema):
+            rng = np.random.default_rng(0)
+            n = 1000
+            args = (rng.uniform(5e7, 5e8, n), rng.uniform(0.05, 0.2, n),
+                    rng.integers(12, 361, n), rng.uniform(0, 1e5, n))
+            return lambda: simular_lote(*args, sistema=sistema)
+        casos.append((f"lote/sistema={sistema}/creditos=1000", preparar_lote))
+
+    # Cribado de cartera: la mayoría sin aportes (forma cerrada) y una parte
+    # con aportes, que pasa por el motor sin armar la tabla.
+    def preparar_cartera():
+        rng = np.random.default_rng(0)
+        escenarios = [
+            {"nombre": f"c{i}", "monto": float(rng.uniform(5e7, 5e8)),
+             "tasa": float(rng.uniform(0.05, 0.2)), "plazo": int(rng.integers(12, 361)),
+             "seguro": float(rng.uniform(0, 1e5)), "fecha_inicio": date(2024, 1, 1),
+             "aportes": [{"mes": 6, "monto": 1e7, "modo": "plazo"}] if i % 20 == 0 else []}
+            for i in range(1000)
+        ]
+        return lambda: totales_cartera(escenarios, 0.10)
+    casos.append(("totales_cartera/escenarios=1000", preparar_cartera))
+
+    # La TIR se guarda en caché por flujos: se rota entre más tablas que el
+    # tamaño de esa caché para medir el cálculo y no los aciertos.
+    for plazo in (120, 360):
+        def preparar_modulo(plazo=plazo):
+            tablas = cycle(_tablas_distintas(plazo))
+            return lambda: calcular_indicadores(next(tablas), 0.10)
+
+        def preparar_raiz(plazo=plazo):
+            tablas = cycle(_tablas_distintas(plazo))
+            return lambda: indicadores_raiz.calcular_indicadores(next(tablas), 0.10)
+
+        casos.append((f"indicadores/modulo/plazo={plazo}", preparar_modulo))
+        casos.append((f"indicadores/raiz/plazo={plazo}", preparar_raiz))
+
+    for n_escenarios in (10, 200):
+        def preparar_lectura(n_escenarios=n_escenarios):
+            ruta = carpeta / f"entrada_{n_escenarios}.xlsx"
+            _libro_sintetico(ruta, n_escenarios)
+            return lambda: leer_escenarios_desde_excel(str(ruta))
+        casos.append((f"lectura_excel/escenarios={n_escenarios}", preparar_lectura))
+
+    for streaming in (False, True):
+        def preparar_excel(streaming=streaming):
+            df = generar_tabla_amortizacion(_escenario(360, 5))
+            ind = calcular_indicadores(df, 0.10)
+            ruta = carpeta / f"salida_{streaming}.xlsx"
+            return lambda: exportar_excel(ruta, df, ind, "Benchmark", streaming=streaming)
+        casos.append((f"exportar_excel/plazo=360/streaming={streaming}", preparar_excel))
+
+    def preparar_csv():
+        df = generar_tabla_amortizacion(_escenario(360, 5))
+        return lambda: exportar_csv(carpeta / "salida.csv", df)
+    casos.append(("exportar_csv/plazo=360", preparar_csv))
+
+    # Página visible de la tabla en la app (sin la caché de páginas)
+    def preparar_pagina():
+        df = generar_tabla_amortizacion(_escenario(360, 5))
+        return lambda: pagina_tabla(df, 3)
+    casos.append(("vista/pagina/plazo=360", preparar_pagina))
+
+    def preparar_pdfs():
+        rutas = [
+            generar_pdf_resumen({"Escenario": f"Escenario {i}", "Mes Aporte": 12,
+                                 "Monto Aporte ($)": 5_000_000, "Modo Aporte": "plazo"},
+                                str(carpeta))
+            for i in range(10)
+        ]
+        return lambda: fusionar_pdfs(rutas, str(carpeta / "consolidado.pdf"), "Benchmark")
+    casos.append(("fusionar_pdfs/pdfs=10", preparar_pdfs))
+
+    def preparar_pdfs_memoria():
+        resumenes = [{"Escenario": f"Escenario {i}", "Mes Aporte": 12,
+                      "Monto Aporte ($)": 5_000_000, "Modo Aporte": "plazo"} for i in range(200)]
+        return lambda: fusionar_pdfs(zip((r["Escenario"] for r in resumenes),
+                                         map(renderizar_pdf_resumen, resumenes)),
+                                     str(carpeta / "consolidado_memoria.pdf"), "Benchmark")
+    casos.append(("fusionar_pdfs/memoria/pdfs=200", preparar_pdfs_memoria))
+
+    return casos
+
+
+# =========================
+# Medición
+# =========================
+
+def medir(llamada: Callable[[], object], repeticiones: int, presupuesto_s: float) -> Dict[str, float]:
+    """Mediana y mínimo por llamada; cada muestra agrupa llamadas hasta ~presupuesto_s."""
+    llamada()  # calentamiento (cachés, imports perezosos)
+
+    inicio = time.perf_counter()
+    llamada()
+    una = max(time.perf_counter() - inicio, 1e-9)
+    por_muestra = max(1, int(presupuesto_s / una))
+
+    muestras = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        for _ in range(por_muestra):
+            llamada()
+        muestras.append((time.perf_counter() - inicio) / por_muestra)
+
+    return {
+        "mediana_s": statistics.median(muestras),
+        "min_s": min(muestras),
+        "llamadas": por_muestra * repeticiones,
+    }
+
+
+def entorno() -> Dict[str, object]:
+    """Versiones y equipo de esta corrida (se guardan en "meta")."""
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "plataforma": platform.platform(),
+        "procesador": _modelo_cpu(),
+        "nucleos": os.cpu_count(),
+    }
+
+
+def diferencias_entorno(actual: Dict[str, object], base: Dict[str, object]) -> List[str]:
+    """Claves de ``ENTORNO`` que no coinciden entre la corrida y la línea base."""
+    return [clave for clave in ENTORNO if actual.get(clave) != base.get(clave)]
+
+
+def comparar(resultados: Dict[str, Dict], base: Dict[str, Dict], umbral: float) -> List[str]:
+    """Imprime la comparación y devuelve los casos que empeoraron más del umbral."""
+    regresiones = []
+    print(f"\n{'caso':<50} {'base (ms)':>11} {'actual (ms)':>12} {'cambio':>8}")
+    for nombre, actual in resultados.items():
+        previo = base.get(nombre)
+        if previo is None:
+            print(f"{nombre:<50} {'-':>11} {actual['mediana_s'] * 1e3:>12.3f} {'nuevo':>8}")
+            continue
+        razon = actual["mediana_s"] / previo["mediana_s"]
+        marca = "  ← REGRESIÓN" if razon > 1 + umbral else ""
+        print(f"{nombre:<50} {previo['mediana_s'] * 1e3:>11.3f} "
+              f"{actual['mediana_s'] * 1e3:>12.3f} {razon - 1:>+8.1%}{marca}")
+        if marca:
+            regresiones.append(nombre)
+    return regresiones
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks de la calculadora financiera.")
+    parser.add_argument("--salida", default=str(RESULTADOS),
+                        help="JSON con los resultados de esta corrida "
+                             "(por defecto benchmarks/resultados.json, ignorado por git).")
+    parser.add_argument("--baseline", default=str(BASELINE),
+                        help="JSON de referencia contra el cual comparar.")
+    parser.add_argument("--umbral", type=float, default=0.25,
+                        help="Regresión tolerada como fracción (0.25 = 25%% más lento).")
+    parser.add_argument("--guardar-baseline", action="store_true",
+                        help="Escribe estos resultados como nueva línea base.")
+    parser.add_argument("--filtro", default=None,
+                        help="Solo corre los casos cuyo nombre contenga este texto.")
+    parser.add_argument("--repeticiones", type=int, default=7)
+    parser.add_argument("--rapido", action="store_true",
+                        help="Menos repeticiones y muestras más cortas (para CI).")
+    parser.add_argument("--forzar", action="store_true",
+                        help="Compara aunque la línea base se haya grabado en otro entorno.")
+    args = parser.parse_args(argv)
+
+    repeticiones = 3 if args.rapido else args.repeticiones
+    presupuesto_s = 0.02 if args.rapido else 0.1
+
+    resultados: Dict[str, Dict] = {}
+    with tempfile.TemporaryDirectory(prefix="bench_") as tmp:
+        carpeta = Path(tmp)
+        for nombre, preparar in _casos(carpeta):
+            if args.filtro and args.filtro not in nombre:
+                continue
+            resultados[nombre] = medir(preparar(), repeticiones, presupuesto_s)
+            print(f"{nombre:<50} {resultados[nombre]['mediana_s'] * 1e3:>10.3f} ms")
+
+    informe = {
+        "meta": {"fecha": datetime.now().isoformat(timespec="seconds"), **entorno()},
+        "resultados": resultados,
+    }
+    Path(args.salida).write_text(json.dumps(informe, indent=2, ensure_ascii=False), encoding="utf-8")
+    print(f"\nResultados guardados en {args.salida}")
+
+    if args.guardar_baseline:
+        Path(args.baseline).write_text(json.dumps(informe, indent=2, ensure_ascii=False),
+                                       encoding="utf-8")
+        print(f"Línea base actualizada: {args.baseline}")
+        return 0
+
+    ruta_base = Path(args.baseline)
+    if not ruta_base.exists():
+        print("Sin línea base; use --guardar-baseline para crearla.")
+        return 0
+
+    base = json.loads(ruta_base.read_text(encoding="utf-8"))
+    distintas = diferencias_entorno(informe["meta"], base.get("meta", {}))
+    if distintas and not args.forzar:
+        for clave in distintas:
+            print(f"  {clave}: base={base.get('meta', {}).get(clave)!r} "
+                  f"actual={informe['meta'].get(clave)!r}")
+        print("⚠️ La línea base es de otro entorno; no se compara. Grabe una propia con "
+              "--guardar-baseline (o use --forzar).")
+        return 2
+    regresiones = comparar(resultados, base["resultados"], args.umbral)
+    if regresiones:
+        print(f"\n❌ {len(regresiones)} caso(s) más lentos que la base por más de {args.umbral:.0%}.")
+        return 1
+    print("\n✅ Sin regresiones.")
+    return 0
+
+
+# =========================
+# Ayudantes privados
+# =========================
+
+def _modelo_cpu() -> str:
+    """Nombre del procesador; en Linux ``platform.processor()`` solo da la arquitectura."""
+    try:
+        with open("/proc/cpuinfo", encoding="utf-8") as f:
+            for linea in f:
+                if linea.startswith("model name"):
+                    return linea.split(":", 1)[1].strip()
+    except OSError:
+        pass
+    return platform.processor() or platform.machine()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,11 @@
 # indicators.py
-import numpy_financial as npf
+import numpy as np
 import pandas as pd
 from typing import Dict, Union
 
+from modules.indicators import mes_recuperacion, monto_desembolsado
+from modules.irr import tir, vpn
+
 
 def calcular_indicadores(df_amortizacion: pd.DataFrame,
                           tasa_descuento_anual: float) -> Dict[str, Union[float, int, None]]:
@@ -23,15 +26,18 @@ def calcular_indicadores(df_amortizacion: pd.DataFrame,
     # ================================
     # Flujo inicial positivo (monto recibido)
     # ================================
-    monto_inicial = df_amortizacion.iloc[0]["Saldo ($)"] + \
-                    df_amortizacion.iloc[0]["Amortización ($)"]
+    monto_inicial = monto_desembolsado(df_amortizacion)
     flujos = [monto_inicial] + df_amortizacion["Flujo ($)"].tolist()
 
     # ================================
     # TIR (tasa interna de retorno)
     # ================================
+    # Newton arrancando desde la tasa mensual del crédito; el CET reutiliza
+    # este mismo resultado porque los flujos son idénticos.
+    interes_mes_1 = df_amortizacion.iloc[0]["Interés ($)"]
+    tasa_credito = interes_mes_1 / monto_inicial if monto_inicial else 0.01
     try:
-        tir_mensual = npf.irr(flujos)
+        tir_mensual = tir(flujos, estimado=tasa_credito)
         tir_anual = (1 + tir_mensual) ** 12 - 1 if tir_mensual else None
     except Exception:
         tir_anual = None
@@ -41,48 +47,34 @@ def calcular_indicadores(df_amortizacion: pd.DataFrame,
     # ================================
     tasa_m_desc = tasa_descuento_anual / 12
     try:
-        vpn = npf.npv(tasa_m_desc, flujos[1:]) + flujos[0]
+        valor_presente = vpn(tasa_m_desc, flujos[1:]) + flujos[0]
     except Exception:
-        vpn = None
+        valor_presente = None
 
     # ================================
     # Periodo de recuperación (sin descuento)
     # ================================
-    acumulado = 0
-    recuperacion = None
-    for i, f in enumerate(flujos[1:], start=1):
-        acumulado += f
-        if acumulado >= 0:
-            recuperacion = i
-            break
+    recuperacion = mes_recuperacion(np.cumsum(flujos[1:]))
 
     # ================================
     # CET (Costo Efectivo Total anualizado)
     # ================================
-    try:
-        cet_mensual = npf.irr(flujos)
-        cet_anual = (1 + cet_mensual) ** 12 - 1 if cet_mensual else None
-    except Exception:
-        cet_anual = None
+    cet_anual = tir_anual
 
     # ================================
     # Payback descontado
     # ================================
-    acumulado_desc = monto_inicial
-    payback_desc = None
-    for i, f in enumerate(flujos[1:], 1):
-        f_desc = f / ((1 + tasa_m_desc) ** i)
-        acumulado_desc += f_desc
-        if acumulado_desc >= 0:
-            payback_desc = i
-            break
+    # Un solo arreglo de factores; el acumulado arranca en el monto recibido
+    periodos = np.arange(1, len(flujos))
+    flujos_desc = np.asarray(flujos[1:], dtype=float) / (1 + tasa_m_desc) ** periodos
+    payback_desc = mes_recuperacion(np.cumsum(np.concatenate(([monto_inicial], flujos_desc)))[1:])
 
     # ================================
     # Resultado
     # ================================
     return {
         "TIR (%)": round(tir_anual * 100, 2) if tir_anual else None,
-        "VPN ($)": round(vpn, 2) if vpn is not None else None,
+        "VPN ($)": round(valor_presente, 2) if valor_presente is not None else None,
         "Periodo de Recuperación (meses)": recuperacion,
         "CET (%)": round(cet_anual * 100, 2) if cet_anual else None,
         "Payback Descontado (meses)": payback_desc
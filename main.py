@@ -1,51 +1,304 @@
-from modules.inputs import leer_escenarios_desde_excel
-from modules.amortization import generar_tabla_amortizacion
+from modules.inputs import iterar_escenarios_desde_excel
+from modules.amortization import generar_cronograma
 from modules.indicators import calcular_indicadores
-from modules.exporter import exportar_excel
-from modules.pdf_generator import generar_pdf_resumen
+from modules.exporter import exportar_excel, exportar_csv, LibroConsolidado
+from modules.pdf_generator import renderizar_pdf_resumen
 from modules.pdf_merge import fusionar_pdfs
+from modules.store import AlmacenResultados, cargar_resultados
+from modules.profiling import Traza
+from modules.cache import clave_escenario
+from modules.checkpoint import Manifiesto
 
+import argparse
 import os
-import pandas as pd
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from itertools import repeat
+from pathlib import Path
+from typing import Dict, Optional, Sequence
 
-def main():
-    ruta_entrada = "entrada_usuario.xlsx"
-    carpeta_salida = "informes"
+import numpy as np
+
+FORMATOS = ("xlsx", "csv", "parquet", "pdf")
+RESPONSABLE_POR_DEFECTO = "No especificado"
+
+
+def procesar_escenario(escenario: dict, carpeta_salida: str,
+                       formatos: Sequence[str] = ("xlsx", "pdf"),
+                       previo: Optional[Dict] = None, recalcular: bool = True) -> Dict:
+    """Amortiza, calcula indicadores y exporta un escenario.
+
+    Devuelve un dict con ``nombre``, ``tabla``, ``indicadores``, ``pdf`` (y
+    ``pdf_bytes`` si se acaba de generar), ``archivos`` (rutas escritas),
+    ``traza`` y ``reanudado``.  Si ``previo``
+    es la entrada del manifiesto de una corrida anterior, no se vuelve a
+    exportar nada; la tabla y los indicadores solo se recalculan si
+    ``recalcular`` (los necesita algún destino).  Es una función de módulo
+    para que el pool de procesos pueda serializarla.
+    """
+    traza = Traza()
+    traza.contar("escenarios")
+    resultado = {"nombre": escenario["nombre"], "tabla": None, "indicadores": None,
+                 "pdf": None, "archivos": [], "traza": traza, "reanudado": previo is not None}
+
+    if previo is not None:
+        traza.contar("reanudados")
+        resultado["pdf"] = previo.get("pdf")
+        resultado["archivos"] = previo.get("archivos", [])
+        if not recalcular:
+            return resultado
+
+    with traza.etapa("amortizacion"):
+        cronograma = generar_cronograma(escenario)
+        df_amort = cronograma.to_frame()
+    traza.contar("filas", len(cronograma))
+    with traza.etapa("indicadores"):
+        indicadores = calcular_indicadores(df_amort, tasa_descuento_anual=escenario["tasa"])
+    resultado["tabla"], resultado["indicadores"] = df_amort, indicadores
+    if previo is not None:
+        return resultado
+
+    nombre_base = escenario["nombre"].replace(" ", "_")
+    archivos = resultado["archivos"]
+    if "xlsx" in formatos:
+        ruta = os.path.join(carpeta_salida, f"{nombre_base}.xlsx")
+        with traza.etapa("excel"):
+            exportar_excel(ruta, df_amort, indicadores, escenario["nombre"])
+        archivos.append(ruta)
+    if "csv" in formatos:
+        ruta = os.path.join(carpeta_salida, f"{nombre_base}.csv")
+        with traza.etapa("csv"):
+            exportar_csv(ruta, df_amort)
+        archivos.append(ruta)
+    if "parquet" in formatos:
+        ruta = os.path.join(carpeta_salida, f"{nombre_base}.parquet")
+        with traza.etapa("parquet"):
+            cronograma.to_frame(numerico=True).to_parquet(ruta, index=False)
+        archivos.append(ruta)
+
+    aporte = _primer_aporte(escenario, cronograma.plazo)
+    if "pdf" not in formatos or aporte is None:
+        return resultado
+
+    recalculadas = cronograma.nueva_cuota[~np.isnan(cronograma.nueva_cuota)]
+    nueva_cuota = recalculadas.max() if recalculadas.size else None
+
+    resumen_aporte = {
+        "Escenario": escenario["nombre"],
+        "Mes Aporte": aporte["mes"],
+        "Monto Aporte ($)": aporte["monto"],
+        "Modo Aporte": aporte["modo"],
+        "Nueva Cuota": nueva_cuota,
+        "Fecha Aporte": str(cronograma.fecha[cronograma.mes == aporte["mes"]][0]),
+        "Reducción Estimada": "Disminución de cuota" if aporte["modo"] == "cuota" else "Disminución de plazo"
+    }
+
+    # Se renderiza en memoria (en el proceso hijo si hay pool): los bytes van
+    # directo a la fusión y el archivo individual queda para reanudar.
+    with traza.etapa("pdf"):
+        contenido = renderizar_pdf_resumen(resumen_aporte)
+        ruta_pdf = os.path.join(carpeta_salida, f"resumen_{nombre_base}.pdf")
+        with open(ruta_pdf, "wb") as f:
+            f.write(contenido)
+    traza.contar("pdfs")
+    resultado["pdf"], resultado["pdf_bytes"] = ruta_pdf, contenido
+    archivos.append(ruta_pdf)
+    return resultado
+
+
+def main(ruta_entrada: str = "entrada_usuario.xlsx", carpeta_salida: str = "informes",
+         formatos: Sequence[str] = ("xlsx", "pdf"), workers: int = 1,
+         responsable: Optional[str] = None, reanudar: bool = False,
+         carpeta_almacen: Optional[str] = None, consolidado: bool = False,
+         ruta_traza: Optional[str] = None, perfilador: Optional[str] = None):
     os.makedirs(carpeta_salida, exist_ok=True)
 
-    escenarios = leer_escenarios_desde_excel(ruta_entrada)
+    # Tiempos por etapa; con workers > 1 el perfil solo cubre el proceso principal
+    traza = Traza(perfilador=perfilador)
+    with traza:
+        fallidos = _ejecutar(traza, ruta_entrada, carpeta_salida, formatos, workers, responsable,
+                             reanudar, carpeta_almacen, consolidado)
+
+    if ruta_traza:
+        traza.guardar(ruta_traza)
+        print(f"⏱️ Traza guardada en {ruta_traza}")
+    return fallidos
+
+
+def _ejecutar(traza: Traza, ruta_entrada: str, carpeta_salida: str, formatos: Sequence[str],
+              workers: int, responsable: Optional[str], reanudar: bool,
+              carpeta_almacen: Optional[str], consolidado: bool) -> list:
+    """Procesa todos los escenarios; devuelve los nombres de los que fallaron."""
+    manifiesto = Manifiesto(carpeta_salida, reanudar=reanudar)
+    if manifiesto.hechos:
+        print(f"↩️ Reanudando: {len(manifiesto.hechos)} escenario(s) registrados en {manifiesto.ruta}")
+
+    # Al reanudar, lo que ya está en el almacén no se vuelve a agregar
+    almacenados = _escenarios_almacenados(carpeta_almacen) if reanudar and carpeta_almacen else set()
+
+    # Lectura en streaming: cada escenario se procesa apenas se lee su fila
+    escenarios = traza.medir_iterador("lectura", iterar_escenarios_desde_excel(ruta_entrada))
+    tareas = (_tarea(esc, formatos, manifiesto, almacenados, carpeta_almacen, consolidado)
+              for esc in escenarios)
     lista_pdfs = []
+    fallidos = []
 
-    for escenario in escenarios:
-        print(f"Procesando: {escenario['nombre']}")
-        df_amort = generar_tabla_amortizacion(escenario)
-        indicadores = calcular_indicadores(df_amort, tasa_descuento_anual=escenario["tasa"])
-        nombre_base = escenario["nombre"].replace(" ", "_")
-        ruta_excel = os.path.join(carpeta_salida, f"{nombre_base}.xlsx")
-        exportar_excel(ruta_excel, df_amort, indicadores, escenario["nombre"])
-
-        if escenario.get("mes_aporte") is not None:
-            columna_cuotas = pd.to_numeric(df_amort["Nueva Cuota ($)"], errors="coerce")
-            nueva_cuota = columna_cuotas.max() if not columna_cuotas.isna().all() else None
-
-            resumen_aporte = {
-                "Escenario": escenario["nombre"],
-                "Mes Aporte": escenario["mes_aporte"],
-                "Monto Aporte ($)": escenario["monto_aporte"],
-                "Modo Aporte": escenario["modo_aporte"],
-                "Nueva Cuota": nueva_cuota,
-                "Fecha Aporte": df_amort[df_amort["Mes"] == escenario["mes_aporte"]]["Fecha"].values[0],
-                "Reducción Estimada": "Disminución de cuota" if escenario["modo_aporte"] == "cuota" else "Disminución de plazo"
-            }
-
-            ruta_pdf = generar_pdf_resumen(resumen_aporte, carpeta_salida)
-            lista_pdfs.append(ruta_pdf)
+    with ExitStack() as pila:
+        pila.enter_context(manifiesto)
+        if workers > 1:
+            # pool.map envía todas las tareas de una vez, así que la lista no
+            # cuesta más; con ella se reparte en bloques y se ahorran viajes
+            tareas = list(tareas)
+            chunksize = max(1, len(tareas) // (workers * 4))
+            # pool.map conserva el orden de entrada → PDFs en orden determinista
+            pool = pila.enter_context(ProcessPoolExecutor(max_workers=workers))
+            resultados = pool.map(_procesar_tarea, tareas,
+                                  repeat(carpeta_salida), repeat(tuple(formatos)),
+                                  chunksize=chunksize)
+        else:
+            resultados = map(_procesar_tarea, tareas,
+                             repeat(carpeta_salida), repeat(tuple(formatos)))
+
+        # Destinos que reciben cada resultado a medida que llega
+        destinos = []
+        if carpeta_almacen:
+            destinos.append(pila.enter_context(AlmacenResultados(carpeta_almacen)))
+        if consolidado:
+            ruta_consolidado = os.path.join(carpeta_salida, "informe_consolidado.xlsx")
+            destinos.append(pila.enter_context(LibroConsolidado(ruta_consolidado)))
+
+        inicio = time.perf_counter()
+        for n, (clave, resultado) in enumerate(resultados, start=1):
+            nombre = resultado["nombre"]
+            traza.fusionar(resultado["traza"])
+            if resultado.get("error"):
+                # Una fila mala no detiene el lote; queda en el manifiesto y
+                # se reintenta al reanudar
+                manifiesto.registrar(clave, nombre, [], error=resultado["error"])
+                fallidos.append(nombre)
+                print(f"[{n}] {nombre}: error – {resultado['error']}", flush=True)
+                continue
+            with traza.etapa("destinos"):
+                for destino in destinos:
+                    if isinstance(destino, AlmacenResultados) and nombre in almacenados:
+                        continue
+                    destino.agregar(nombre, resultado["tabla"], resultado["indicadores"])
+            if not resultado["reanudado"]:
+                manifiesto.registrar(clave, nombre, resultado["archivos"], resultado["pdf"])
+            if resultado.get("pdf_bytes"):
+                lista_pdfs.append((nombre, resultado["pdf_bytes"]))
+            elif resultado["pdf"]:
+                lista_pdfs.append(resultado["pdf"])  # reanudado: se lee del disco
+
+            estado = "reanudado" if resultado["reanudado"] else "listo"
+            ritmo = n / max(time.perf_counter() - inicio, 1e-9)
+            print(f"[{n}] {nombre}: {estado} ({ritmo:.1f} esc/s)", flush=True)
 
     if lista_pdfs:
-        fusionar_pdfs(lista_pdfs, os.path.join(carpeta_salida, "informe_aportes_final.pdf"))
+        if responsable is None and not sys.stdin.isatty():
+            responsable = RESPONSABLE_POR_DEFECTO  # sin terminal no se puede preguntar
+        with traza.etapa("fusion_pdf"):
+            fusionar_pdfs(lista_pdfs, os.path.join(carpeta_salida, "informe_aportes_final.pdf"),
+                          nombre_usuario=responsable)
         print("✅ Informe consolidado generado con éxito.")
     else:
         print("No se registraron aportes anticipados, no se generó informe PDF.")
 
+    if fallidos:
+        print(f"⚠️ {len(fallidos)} escenario(s) con error: {', '.join(fallidos)}")
+    return fallidos
+
+
+def _procesar_tarea(tarea: tuple, carpeta_salida: str, formatos: Sequence[str]) -> tuple:
+    clave, escenario, previo, recalcular = tarea
+    try:
+        resultado = procesar_escenario(escenario, carpeta_salida, formatos, previo, recalcular)
+    except Exception as exc:
+        return clave, _fallido(escenario, f"{type(exc).__name__}: {exc}")
+    if not recalcular:
+        resultado["tabla"] = None  # ningún destino la usa: no viaja de vuelta al proceso principal
+    return clave, resultado
+
+
+# =========================
+# Ayudantes privados
+# =========================
+
+def _tarea(escenario: dict, formatos: Sequence[str], manifiesto: Manifiesto, almacenados: set,
+           carpeta_almacen: Optional[str], consolidado: bool) -> tuple:
+    # Nombre y formatos forman parte de la clave: cambian los archivos que se escriben
+    clave = f"{escenario['nombre']}|{','.join(sorted(formatos))}|{clave_escenario(escenario)}"
+    recalcular = consolidado or bool(carpeta_almacen and escenario["nombre"] not in almacenados)
+    return clave, escenario, manifiesto.previo(clave), recalcular
+
+
+def _fallido(escenario: dict, error: str) -> Dict:
+    return {"nombre": escenario["nombre"], "tabla": None, "indicadores": None, "pdf": None,
+            "archivos": [], "traza": Traza(), "reanudado": False, "error": error}
+
+
+def _primer_aporte(escenario: dict, plazo: int) -> Optional[Dict]:
+    """Aporte que resume el PDF: el de las columnas clásicas o el primero de la lista.
+
+    Los aportes fuera del plazo no se aplican (ver ``_agrupar_aportes``) y
+    no tienen fecha en el calendario, así que no cuentan.
+    """
+    if escenario.get("mes_aporte") is not None:
+        aportes = [{"mes": escenario["mes_aporte"], "monto": escenario["monto_aporte"],
+                    "modo": escenario["modo_aporte"]}]
+    else:
+        aportes = escenario.get("aportes") or []
+    aportes = [a for a in aportes if 1 <= int(a["mes"]) <= plazo]
+    return min(aportes, key=lambda a: a["mes"]) if aportes else None
+
+
+def _escenarios_almacenados(carpeta_almacen: str) -> set:
+    if not (Path(carpeta_almacen) / "indicadores").is_dir():
+        return set()
+    _, indicadores = cargar_resultados(carpeta_almacen, como_arrow=True)
+    if "Escenario" not in indicadores.column_names:
+        return set()
+    return set(indicadores.column("Escenario").to_pylist())
+
+
+def _formatos(texto: str) -> tuple:
+    formatos = tuple(f.strip().lower() for f in texto.split(",") if f.strip())
+    desconocidos = [f for f in formatos if f not in FORMATOS]
+    if desconocidos:
+        raise argparse.ArgumentTypeError(
+            f"formato(s) no soportado(s): {', '.join(desconocidos)}; use {', '.join(FORMATOS)}")
+    return formatos
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Genera los informes de todos los escenarios.")
+    parser.add_argument("--entrada", metavar="RUTA.xlsx", default="entrada_usuario.xlsx",
+                        help="Libro con los escenarios (por defecto entrada_usuario.xlsx)")
+    parser.add_argument("--salida", metavar="CARPETA", default="informes",
+                        help="Carpeta de los informes (por defecto informes)")
+    parser.add_argument("--formatos", type=_formatos, default=("xlsx", "pdf"),
+                        help=f"Lista separada por comas de {','.join(FORMATOS)} (por defecto xlsx,pdf)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Procesos en paralelo (0 = todos los núcleos disponibles)")
+    parser.add_argument("--responsable", default=None,
+                        help="Nombre en la portada del PDF; sin él se pregunta "
+                             f"(o se usa «{RESPONSABLE_POR_DEFECTO}» si no hay terminal)")
+    parser.add_argument("--reanudar", action="store_true",
+                        help="Continúa una corrida interrumpida usando el manifiesto de la salida")
+    parser.add_argument("--almacen", metavar="CARPETA", default=None,
+                        help="Guarda tablas e indicadores en un almacén columnar (Arrow)")
+    parser.add_argument("--consolidado", action="store_true",
+                        help="Además, un solo xlsx con una hoja por escenario y un resumen")
+    parser.add_argument("--traza", metavar="RUTA.json", default=None,
+                        help="Guarda tiempos por etapa y contadores en un JSON")
+    parser.add_argument("--perfil", choices=["cprofile", "pyinstrument"], default=None,
+                        help="Incluye en la traza un perfil de la corrida")
+    args = parser.parse_args()
+    fallidos = main(ruta_entrada=args.entrada, carpeta_salida=args.salida, formatos=args.formatos,
+         workers=args.workers or os.cpu_count() or 1, responsable=args.responsable,
+         reanudar=args.reanudar, carpeta_almacen=args.almacen, consolidado=args.consolidado,
+         ruta_traza=args.traza or (os.path.join(args.salida, "traza.json") if args.perfil else None),
+         perfilador=args.perfil)
+    sys.exit(1 if fallidos else 0)
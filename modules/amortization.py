@@ -1,14 +1,98 @@
+import numpy as np
 import pandas as pd
-from datetime import timedelta
+from collections import deque
+from typing import Dict, List
+
+from modules.dates import calendario_pagos, fecha_desembolso
+from modules.schedule import Cronograma
+from modules.systems import SISTEMA_POR_DEFECTO, amortizar
+from modules.uvr import serie_de_escenario
+
 
 def generar_tabla_amortizacion(parametros: dict) -> pd.DataFrame:
+    return generar_cronograma(parametros).to_frame()
+
+
+def generar_cronograma(parametros: dict) -> Cronograma:
+    """Como ``generar_tabla_amortizacion`` pero sin construir el DataFrame.
+
+    Con ``parametros["denominacion"] == "uvr"`` el crédito se amortiza en
+    unidades UVR (ver ``generar_cronograma_uvr``).  ``parametros["sistema"]``
+    elige el sistema de amortización (ver ``modules.systems``); por defecto
+    el francés (cuota fija).
+    """
+    if es_uvr(parametros):
+        return generar_cronograma_uvr(parametros)
+
     monto         = parametros["monto"]
     tasa_anual    = parametros["tasa"]        # EA en decimal, p.ej. 0.1095
     plazo         = parametros["plazo"]
     seguro        = parametros["seguro"]
-    fecha_inicio  = parametros["fecha_inicio"]
 
-    # Retrocompatibilidad: convertir aporte único a lista
+    aportes = normalizar_aportes(parametros)
+
+    columnas = calcular_columnas_sistema(parametros.get("sistema"), monto, tasa_anual, plazo,
+                                         seguro, aportes, **opciones_sistema(parametros))
+    return _cronograma_desde_columnas(parametros, columnas)
+
+
+def generar_cronograma_uvr(parametros: dict) -> Cronograma:
+    """Crédito denominado en UVR (sistema de cuota constante en UVR).
+
+    El monto y los aportes en pesos se pasan a unidades con la UVR del
+    desembolso y de cada fecha de pago; ``tasa`` es la tasa real (EA) sobre
+    la UVR.  El motor de siempre amortiza en unidades y el resultado se
+    convierte a pesos multiplicando cada columna por el arreglo de factores
+    de la serie (una sola búsqueda vectorizada).  La corrección monetaria de
+    cada mes es el saldo anterior en UVR por la variación de la UVR.
+    """
+    plazo = parametros["plazo"]
+    seguro = parametros["seguro"]
+    serie = serie_de_escenario(parametros)
+
+    regla = parametros.get("regla_fecha", "mismo_dia")
+    fechas = calendario_pagos(parametros["fecha_inicio"], plazo, regla=regla,
+                              dia_habil=parametros.get("dia_habil"))
+    factores = serie.factores(np.concatenate(([fecha_desembolso(parametros["fecha_inicio"], regla)],
+                                              fechas)))
+    uvr_desembolso, uvr = factores[0], factores[1:]
+
+    aportes = [dict(a, monto=a["monto"] / uvr[int(a["mes"]) - 1])
+               for a in normalizar_aportes(parametros) if 1 <= int(a["mes"]) <= plazo]
+
+    # El seguro se cobra en pesos: se suma después de convertir
+    unidades = calcular_columnas_sistema(parametros.get("sistema"),
+                                         parametros["monto"] / uvr_desembolso, parametros["tasa"],
+                                         plazo, 0.0, aportes, **opciones_sistema(parametros))
+    saldo_previo = np.concatenate(([parametros["monto"] / uvr_desembolso], unidades["saldo"][:-1]))
+
+    columnas = dict(unidades)
+    for nombre in ("cuota", "interes", "amortizacion", "saldo", "aporte"):
+        columnas[nombre] = unidades[nombre] * uvr
+    columnas["flujo"] = unidades["flujo"] * uvr - seguro
+    columnas["correccion"] = np.where(unidades["activo"],
+                                      saldo_previo * np.diff(factores), 0.0)
+    return Cronograma.desde_columnas(columnas, fechas, seguro, uvr=uvr)
+
+
+def es_uvr(parametros: dict) -> bool:
+    return str(parametros.get("denominacion", "pesos")).strip().lower() == "uvr"
+
+
+def opciones_sistema(parametros: dict) -> Dict[str, float]:
+    """Opciones del núcleo que vienen en el escenario (hoy solo ``crecimiento``)."""
+    if parametros.get("sistema") == "gradual" and parametros.get("crecimiento") is not None:
+        return {"crecimiento": float(parametros["crecimiento"])}
+    return {}
+
+
+def normalizar_aportes(parametros: dict) -> List[dict]:
+    """Devuelve la lista de aportes ordenada por mes.
+
+    Retrocompatibilidad: si el escenario trae el aporte único
+    (``mes_aporte``/``monto_aporte``/``modo_aporte``) se convierte a lista y
+    se deja guardado en ``parametros["aportes"]``.
+    """
     if "aportes" not in parametros:
         mes_aporte = parametros.get("mes_aporte")
         monto_aporte = parametros.get("monto_aporte", 0)
@@ -16,97 +100,322 @@ def generar_tabla_amortizacion(parametros: dict) -> pd.DataFrame:
         if mes_aporte is not None and monto_aporte:
             parametros["aportes"] = [{"mes": mes_aporte, "monto": monto_aporte, "modo": modo_aporte}]
 
-    aportes = sorted(parametros.get("aportes", []), key=lambda a: a["mes"])
+    return sorted(parametros.get("aportes", []), key=lambda a: a["mes"])
+
 
+def calcular_columnas(monto: float, tasa_anual: float, plazo: int,
+                      seguro: float, aportes: List[dict]) -> Dict[str, np.ndarray]:
+    """Motor columnar de amortización (sistema de cuota fija / PMT).
 
+    Los tramos entre aportes se resuelven con la fórmula cerrada del saldo,
+    de modo que solo los meses con aporte se calculan período a período.
+    Devuelve arreglos NumPy sin redondear, uno por columna:
 
+    mes, cuota, interes, amortizacion, saldo, flujo, aporte  – float / int
+    activo            – el crédito seguía vivo al inicio del mes
+    aporte_aplicado   – hubo al menos un aporte en el mes
+    cuota_recalculada – algún aporte del mes fue de tipo «cuota»
+    """
     # → Aquí la corrección clave:
     tasa_mensual = (1 + tasa_anual) ** (1/12) - 1
 
     # Cuota PMT con tasa mensual
-    cuota = monto * (tasa_mensual * (1 + tasa_mensual)**plazo) \
-            / ((1 + tasa_mensual)**plazo - 1)
+    cuota = _cuota_pmt(monto, tasa_mensual, plazo)
+
+    columnas = _columnas_vacias(plazo, seguro)
+    _amortizar_desde(columnas, 1, monto, cuota, tasa_mensual, plazo, seguro,
+                     _agrupar_aportes(aportes, plazo))
+    return columnas
+
+
+def calcular_columnas_sistema(sistema: str | None, monto: float, tasa_anual: float, plazo: int,
+                              seguro: float, aportes: List[dict], **opciones) -> Dict[str, np.ndarray]:
+    """``calcular_columnas`` para cualquier sistema registrado.
+
+    El francés usa el motor de siempre.  Los demás toman su núcleo de
+    ``modules.systems`` por tramos: en cada mes con aporte se cobra la cuota
+    programada, se descuenta el aporte y el saldo se reamortiza con el mismo
+    sistema en los meses restantes.  Por eso solo admiten aportes que
+    reducen la cuota.
+    """
+    if (sistema or SISTEMA_POR_DEFECTO) == SISTEMA_POR_DEFECTO:
+        return calcular_columnas(monto, tasa_anual, plazo, seguro, aportes)
+
+    aportes_por_mes = _agrupar_aportes(aportes, plazo)
+    if any(a["modo"] != "cuota" for grupo in aportes_por_mes.values() for a in grupo):
+        raise ValueError(f"El sistema {sistema!r} solo admite aportes con reducción de cuota.")
+
+    tasa_mensual = (1 + tasa_anual) ** (1/12) - 1
+    columnas = _columnas_vacias(plazo, seguro)
+    inicio, saldo = 1, float(monto)
+    for limite in sorted(aportes_por_mes) + [plazo + 1]:
+        if saldo <= 0:
+            break
+        restantes = plazo - inicio + 1
+        tramo = amortizar(sistema, saldo, tasa_mensual, restantes, **opciones)
+        if inicio > 1:
+            # Como en el francés, el mes del aporte ya muestra la cuota nueva
+            columnas["cuota"][inicio - 2] = tramo["cuota"][0, 0]
+            columnas["flujo"][inicio - 2] = -(tramo["cuota"][0, 0] + seguro)
+        n = min(limite, plazo) - inicio + 1
+        filas = slice(inicio - 1, inicio - 1 + n)
+        for nombre in ("cuota", "interes", "amortizacion", "saldo"):
+            columnas[nombre][filas] = tramo[nombre][0, :n]
+        columnas["flujo"][filas] = -(columnas["cuota"][filas] + seguro)
+        columnas["activo"][filas] = True
+        if limite > plazo:
+            break
+
+        # Mes con aporte: cuota programada, luego se descuenta el aporte
+        i = limite - 1
+        total = sum(a["monto"] for a in aportes_por_mes[limite])
+        saldo = max(float(columnas["saldo"][i]) - total, 0.0)
+        columnas["saldo"][i] = saldo
+        columnas["aporte"][i] = total
+        columnas["aporte_aplicado"][i] = True
+        columnas["cuota_recalculada"][i] = True
+        inicio = limite + 1
+    return columnas
+
+
+class AmortizadorIncremental:
+    """Reamortiza reutilizando cronogramas calculados antes.
+
+    Cuando solo cambian los aportes, se busca el primer mes que difiere
+    respecto a un cronograma reciente con los mismos monto/tasa/plazo/seguro,
+    se conserva intacto el tramo anterior y solo se recalcula desde ahí.
+    El resultado es idéntico bit a bit al de ``calcular_columnas``.
+
+    Los arreglos devueltos se comparten con el historial: no modificarlos.
+    """
+
+    def __init__(self, max_historial: int = 8):
+        # Cada entrada: (base, aportes_por_mes, columnas)
+        self._historial = deque(maxlen=max_historial)
+
+    def columnas(self, monto: float, tasa_anual: float, plazo: int,
+                 seguro: float, aportes: List[dict]) -> Dict[str, np.ndarray]:
+        base = (monto, tasa_anual, plazo, seguro)
+        aportes_por_mes = _agrupar_aportes(aportes, plazo)
 
-    saldo       = monto
-    tabla       = []
-    idx_aporte = 0
+        # Elegir el cronograma previo que permita reanudar más tarde
+        mejor, inicio = None, 1
+        for previo in list(self._historial):
+            if previo[0] != base:
+                continue
+            reanudar = _mes_reanudacion(previo[1], aportes_por_mes, plazo)
+            if reanudar > inicio:
+                mejor, inicio = previo, reanudar
 
+        if mejor is None:
+            columnas = calcular_columnas(monto, tasa_anual, plazo, seguro, aportes)
+        else:
+            columnas = _reanudar(mejor[2], inicio, tasa_anual, plazo, seguro, aportes_por_mes)
 
-    # ✅ Variables con respaldo por si no existen en el diccionario
-    mes_aporte = parametros.get("mes_aporte")
-    monto_aporte = parametros.get("monto_aporte", 0)
-    modo_aporte = parametros.get("modo_aporte", "plazo")
-    aporte_aplicado = False
+        self._historial.append((base, aportes_por_mes, columnas))
+        return columnas
 
-    for mes in range(1, plazo + 1):
-        fecha = fecha_inicio + timedelta(days=30 * (mes - 1))
+    @staticmethod
+    def derivar(previas: Dict[str, np.ndarray], aportes_previos: List[dict],
+                monto: float, tasa_anual: float, plazo: int, seguro: float,
+                aportes: List[dict]) -> Dict[str, np.ndarray]:
+        """Como ``columnas`` pero partiendo de un cronograma conocido.
 
-        # Si el saldo ya fue pagado, la cuota va a 0 pero el seguro sigue cobrándose
+        ``previas`` son las columnas de los mismos monto/tasa/plazo/seguro con
+        ``aportes_previos``; no se consulta ni se modifica el historial.  Sirve
+        para evaluar muchas variantes de un mismo cronograma (el optimizador
+        agrega un aporte a la vez).
+        """
+        aportes_por_mes = _agrupar_aportes(aportes, plazo)
+        inicio = _mes_reanudacion(_agrupar_aportes(aportes_previos, plazo), aportes_por_mes, plazo)
+        if inicio == 1:
+            return calcular_columnas(monto, tasa_anual, plazo, seguro, aportes)
+        return _reanudar(previas, inicio, tasa_anual, plazo, seguro, aportes_por_mes)
+
+    def tabla(self, parametros: dict) -> pd.DataFrame:
+        """Equivalente incremental de ``generar_tabla_amortizacion``."""
+        return self.cronograma(parametros).to_frame()
+
+    def cronograma(self, parametros: dict) -> Cronograma:
+        """Equivalente incremental de ``generar_cronograma``."""
+        if es_uvr(parametros) or parametros.get("sistema", SISTEMA_POR_DEFECTO) != SISTEMA_POR_DEFECTO:
+            return generar_cronograma(parametros)
+        aportes = normalizar_aportes(parametros)
+        columnas = self.columnas(parametros["monto"], parametros["tasa"], parametros["plazo"],
+                                 parametros["seguro"], aportes)
+        return _cronograma_desde_columnas(parametros, columnas)
+
+
+# =========================
+# Ayudantes privados
+# =========================
+
+def _cronograma_desde_columnas(parametros: dict, columnas: Dict[str, np.ndarray]) -> Cronograma:
+    fechas = calendario_pagos(parametros["fecha_inicio"], parametros["plazo"],
+                              regla=parametros.get("regla_fecha", "mismo_dia"),
+                              dia_habil=parametros.get("dia_habil"))
+    return Cronograma.desde_columnas(columnas, fechas, parametros["seguro"])
+
+
+def _reanudar(previas: Dict[str, np.ndarray], inicio: int, tasa_anual: float, plazo: int,
+              seguro: float, aportes_por_mes: Dict[int, List[dict]]) -> Dict[str, np.ndarray]:
+    """Copia ``previas`` hasta el mes ``inicio`` y recalcula desde ahí."""
+    if inicio > plazo:
+        return previas                  # mismos aportes: nada que recalcular
+    columnas = {k: v.copy() for k, v in previas.items()}
+    _reiniciar_desde(columnas, inicio, seguro)
+    tasa_mensual = (1 + tasa_anual) ** (1/12) - 1
+    saldo = float(columnas["saldo"][inicio - 2])
+    cuota = float(columnas["cuota"][inicio - 2])
+    _amortizar_desde(columnas, inicio, saldo, cuota, tasa_mensual, plazo, seguro,
+                     aportes_por_mes)
+    return columnas
+
+
+def _columnas_vacias(plazo: int, seguro: float) -> Dict[str, np.ndarray]:
+    # Por defecto cada fila es un mes "pagado": cuota 0, pero el seguro sigue cobrándose
+    return {
+        "mes":               np.arange(1, plazo + 1),
+        "cuota":             np.zeros(plazo),
+        "interes":           np.zeros(plazo),
+        "amortizacion":      np.zeros(plazo),
+        "saldo":             np.zeros(plazo),
+        "flujo":             np.full(plazo, -float(seguro)),
+        "aporte":            np.zeros(plazo),
+        "activo":            np.zeros(plazo, dtype=bool),
+        "aporte_aplicado":   np.zeros(plazo, dtype=bool),
+        "cuota_recalculada": np.zeros(plazo, dtype=bool),
+    }
+
+
+def _reiniciar_desde(columnas: Dict[str, np.ndarray], inicio: int, seguro: float) -> None:
+    """Devuelve a "pagado" todas las filas desde el mes ``inicio``."""
+    vacias = _columnas_vacias(len(columnas["mes"]), seguro)
+    for nombre, valores in columnas.items():
+        valores[inicio - 1:] = vacias[nombre][inicio - 1:]
+
+
+def _agrupar_aportes(aportes: List[dict], plazo: int) -> Dict[int, List[dict]]:
+    """Agrupa los aportes por mes una sola vez (se ignoran los que caen fuera del plazo)."""
+    aportes_por_mes: Dict[int, List[dict]] = {}
+    for aporte in aportes:
+        mes = int(aporte["mes"])
+        if 1 <= mes <= plazo:
+            aportes_por_mes.setdefault(mes, []).append(aporte)
+    return aportes_por_mes
+
+
+def _mes_reanudacion(previos: Dict[int, List[dict]], nuevos: Dict[int, List[dict]],
+                     plazo: int) -> int:
+    """Primer mes que hay que recalcular al pasar de ``previos`` a ``nuevos``.
+
+    Si el primer cambio cae en un mes con aporte se reanuda ahí mismo; si no
+    (se quitó un aporte), se reanuda al comienzo del tramo que lo contiene,
+    porque la fórmula cerrada de un tramo depende de su mes inicial.
+    Sin cambios devuelve ``plazo + 1``.
+    """
+    cambiados = [m for m in previos.keys() | nuevos.keys() if previos.get(m) != nuevos.get(m)]
+    if not cambiados:
+        return plazo + 1
+    primero = min(cambiados)
+    if primero in nuevos:
+        return primero
+    anteriores = [m for m in nuevos if m < primero]
+    return max(anteriores) + 1 if anteriores else 1
+
+
+def _amortizar_desde(columnas: Dict[str, np.ndarray], inicio: int, saldo: float, cuota: float,
+                     tasa_mensual: float, plazo: int, seguro: float,
+                     aportes_por_mes: Dict[int, List[dict]]) -> None:
+    """Llena las columnas desde el mes ``inicio`` con el saldo y la cuota vigentes."""
+    for limite in sorted(m for m in aportes_por_mes if m >= inicio) + [plazo + 1]:
         if saldo <= 0:
-            fila = {
-                "Mes": mes,
-                "Fecha": fecha.strftime("%Y-%m"),
-                "Cuota ($)": 0.0,
-                "Interés ($)": 0.0,
-                "Amortización ($)": 0.0,
-                "Saldo ($)": 0.0,
-                "Seguro ($)": round(seguro, 2),
-                "Flujo ($)": round(-seguro, 2),
-                "Aporte Aplicado": "",
-                "Aporte ($)": 0.0,
-                "Nueva Cuota ($)": ""
-            }
-            tabla.append(fila)
-            continue
-
-        interes = saldo * tasa_mensual
-        amortizacion = cuota - interes
-
-        # Inicializar acumulador del aporte a plazo
-        aporte_plazo_mes = 0
-
-        # Aplicar todos los aportes en este mes
-        aportes_mes = [a for a in aportes if a["mes"] == mes]
-        for aporte in aportes_mes:
-            saldo -= aporte["monto"]
-            if aporte["modo"] == "cuota":
-                cuotas_restantes = plazo - mes
-                if cuotas_restantes > 0:
-                    cuota = saldo * (tasa_mensual * (1 + tasa_mensual) ** cuotas_restantes) \
-                            / ((1 + tasa_mensual) ** cuotas_restantes - 1)
-            else:
-                aporte_plazo_mes += aporte["monto"]
-
-        saldo -= amortizacion
-        saldo = max(saldo, 0)  # evitar saldo negativo
-
-        # Actualizar flujo incluyendo aporte tipo plazo
-        flujo = -(cuota + seguro + aporte_plazo_mes)
-
-
-        fila = {
-            "Mes": mes,
-            "Fecha": fecha.strftime("%Y-%m"),
-            "Cuota ($)": round(cuota, 2),
-            "Interés ($)": round(interes, 2),
-            "Amortización ($)": round(amortizacion, 2),
-            "Saldo ($)": round(saldo, 2),
-            "Seguro ($)": round(seguro, 2),
-            "Flujo ($)": round(flujo, 2),
-            "Aporte Aplicado": "Sí" if aportes_mes else "",
-            "Aporte ($)": sum(a["monto"] for a in aportes_mes) if aportes_mes else "",
-            "Nueva Cuota ($)": round(cuota, 2) if any(a["modo"] == "cuota" for a in aportes_mes) else "",
-
-        }
-        tabla.append(fila)
-
-    df = pd.DataFrame(tabla)
-
-    # Calcular meses ahorrados si el crédito termina antes del plazo original
-    ultimo_mes_util = df[df["Saldo ($)"] > 0]["Mes"].max()
-    if pd.notna(ultimo_mes_util):
-        df["Meses ahorrados"] = [plazo - ultimo_mes_util] * len(df)
-    else:
-        df["Meses ahorrados"] = 0
-
-    return df
+            break
+
+        # Tramo sin aportes [inicio, limite): fórmula cerrada
+        if limite > inicio:
+            saldo = _llenar_tramo(columnas, inicio, limite - inicio,
+                                  saldo, cuota, tasa_mensual, seguro)
+            if saldo <= 0 or limite > plazo:
+                break
+
+        # Mes con aporte: cálculo período a período
+        saldo, cuota = _aplicar_mes_aporte(columnas, limite, saldo, cuota, tasa_mensual,
+                                           plazo, seguro, aportes_por_mes[limite])
+        inicio = limite + 1
+
+
+def _cuota_pmt(saldo: float, tasa_mensual: float, n: int) -> float:
+    return saldo * (tasa_mensual * (1 + tasa_mensual) ** n) \
+           / ((1 + tasa_mensual) ** n - 1)
+
+
+def _llenar_tramo(columnas: Dict[str, np.ndarray], inicio: int, n: int, saldo: float,
+                  cuota: float, tasa_mensual: float, seguro: float) -> float:
+    """Llena ``n`` meses con cuota constante a partir de ``inicio``.
+
+    Devuelve el saldo final del tramo (0 si el crédito se pagó dentro de él).
+    """
+    factor = np.power(1 + tasa_mensual, np.arange(1, n + 1))
+    saldos = saldo * factor - cuota * (factor - 1) / tasa_mensual
+
+    # Si el saldo se agota dentro del tramo, los meses siguientes quedan "pagados"
+    agotado = np.flatnonzero(saldos <= 0)
+    if agotado.size:
+        n = int(agotado[0]) + 1
+        saldos = saldos[:n]
+        saldos[-1] = 0.0
+
+    previos = np.empty(n)
+    previos[0] = saldo
+    previos[1:] = saldos[:-1]
+    interes = previos * tasa_mensual
+
+    tramo = slice(inicio - 1, inicio - 1 + n)
+    columnas["cuota"][tramo] = cuota
+    columnas["interes"][tramo] = interes
+    columnas["amortizacion"][tramo] = cuota - interes
+    columnas["saldo"][tramo] = saldos
+    columnas["flujo"][tramo] = -(cuota + seguro)
+    columnas["activo"][tramo] = True
+
+    return float(saldos[-1])
+
+
+def _aplicar_mes_aporte(columnas: Dict[str, np.ndarray], mes: int, saldo: float,
+                        cuota: float, tasa_mensual: float, plazo: int, seguro: float,
+                        aportes_mes: List[dict]):
+    """Aplica todos los aportes de ``mes`` y devuelve ``(saldo, cuota)`` actualizados."""
+    interes = saldo * tasa_mensual
+    amortizacion = cuota - interes
+
+    # Inicializar acumulador del aporte a plazo
+    aporte_plazo_mes = 0
+    recalculada = False
+
+    for aporte in aportes_mes:
+        saldo -= aporte["monto"]
+        if aporte["modo"] == "cuota":
+            recalculada = True
+            cuotas_restantes = plazo - mes
+            if cuotas_restantes > 0:
+                cuota = _cuota_pmt(saldo, tasa_mensual, cuotas_restantes)
+        else:
+            aporte_plazo_mes += aporte["monto"]
+
+    saldo -= amortizacion
+    saldo = max(saldo, 0)  # evitar saldo negativo
+
+    i = mes - 1
+    columnas["cuota"][i] = cuota
+    columnas["interes"][i] = interes
+    columnas["amortizacion"][i] = amortizacion
+    columnas["saldo"][i] = saldo
+    # Flujo incluyendo aporte tipo plazo
+    columnas["flujo"][i] = -(cuota + seguro + aporte_plazo_mes)
+    columnas["aporte"][i] = sum(a["monto"] for a in aportes_mes)
+    columnas["activo"][i] = True
+    columnas["aporte_aplicado"][i] = True
+    columnas["cuota_recalculada"][i] = recalculada
+
+    return saldo, cuota
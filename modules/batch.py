@@ -0,0 +1,117 @@
+# modules/batch.py
+"""Simulación por lotes: amortiza miles de créditos en una sola llamada.
+
+Cada escenario llega como una posición en arreglos paralelos (monto, tasa,
+plazo, seguro).  Los saldos y flujos se calculan con el núcleo vectorizado
+del sistema de amortización elegido (``modules.systems``, por defecto cuota
+fija) usando *broadcasting* sobre una matriz escenarios × meses, sin
+construir un DataFrame por escenario.
+
+Los lotes no contemplan aportes anticipados; para escenarios con aportes se
+sigue usando ``generar_tabla_amortizacion``.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from modules.irr import tir_vectorizada, vpn_vectorizado
+from modules.systems import SISTEMA_POR_DEFECTO, amortizar
+
+
+def simular_lote(
+    montos: Sequence[float],
+    tasas: Sequence[float],
+    plazos: Sequence[int],
+    seguros: Sequence[float],
+    tasa_descuento_anual: float | Sequence[float] | None = None,
+    nombres: Optional[Sequence[str]] = None,
+    sistema: str = SISTEMA_POR_DEFECTO,
+    **opciones,
+) -> Dict[str, object]:
+    """Amortiza N escenarios a la vez.
+
+    Parámetros
+    ----------
+    montos, tasas, plazos, seguros : arreglos de longitud N
+        ``tasas`` en EA decimal y ``seguros`` como valor mensual, igual que
+        en los diccionarios de escenario.
+    tasa_descuento_anual : escalar o arreglo de longitud N (opcional)
+        Si se omite se descuenta con la tasa de cada crédito (como ``main.py``).
+    nombres : etiquetas opcionales para el índice de la tabla de indicadores.
+    sistema, opciones : sistema de amortización registrado y sus opciones
+        (p. ej. ``crecimiento`` para ``"gradual"``).
+
+    Devuelve un diccionario con:
+        saldos      : matriz N × max(plazo) con el saldo al cierre de cada mes
+        cuotas      : matriz N × max(plazo) con la cuota de cada mes
+        intereses   : matriz N × max(plazo) con el interés de cada mes
+        flujos      : matriz N × max(plazo) con el flujo mensual (negativo)
+        activo      : máscara N × max(plazo), True mientras el mes está en el plazo
+        indicadores : DataFrame con Cuota ($) (la primera), TIR (%), VPN ($) y
+                      Periodo de Recuperación (meses) por escenario
+    """
+    montos = np.asarray(montos, dtype=float)
+    tasas = np.asarray(tasas, dtype=float)
+    plazos = np.asarray(plazos, dtype=int)
+    seguros = np.asarray(seguros, dtype=float)
+    if tasa_descuento_anual is None:
+        tasa_descuento_anual = tasas
+    tasa_descuento_anual = np.broadcast_to(np.asarray(tasa_descuento_anual, dtype=float), montos.shape)
+
+    # Tasa mensual equivalente; el núcleo entrega matrices N × max(plazo)
+    tasa_mensual = (1 + tasas) ** (1/12) - 1
+    meses = np.arange(1, int(plazos.max(initial=0)) + 1)
+    activo = meses[None, :] <= plazos[:, None]
+    columnas = amortizar(sistema, montos, tasa_mensual, plazos, meses, **opciones)
+
+    saldos = columnas["saldo"]
+    cuotas = columnas["cuota"]
+    flujos = np.where(activo, -(cuotas + seguros[:, None]), 0.0)
+
+    indicadores = _indicadores_lote(montos, flujos, tasa_mensual, tasa_descuento_anual)
+    indicadores.insert(0, "Cuota ($)", np.round(cuotas[:, 0] if meses.size else np.zeros_like(montos), 2))
+    if nombres is not None:
+        indicadores.index = pd.Index(list(nombres), name="Escenario")
+
+    return {
+        "saldos": saldos,
+        "cuotas": cuotas,
+        "intereses": columnas["interes"],
+        "flujos": flujos,
+        "activo": activo,
+        "indicadores": indicadores,
+    }
+
+
+# =========================
+# Ayudantes privados
+# =========================
+
+def _indicadores_lote(montos: np.ndarray, flujos: np.ndarray, tasa_mensual: np.ndarray,
+                      tasa_descuento_anual: np.ndarray) -> pd.DataFrame:
+    """Mismas definiciones que ``calcular_indicadores`` pero por filas."""
+    # Flujo inicial positivo (monto del préstamo) + flujos mensuales
+    matriz = np.column_stack([montos, flujos])
+
+    # --- TIR (mensual → anual), arrancando desde la tasa del crédito ---
+    tir_m = tir_vectorizada(matriz, tasa_mensual)
+    tir_a = (1 + tir_m) ** 12 - 1
+
+    # --- VPN: npf.npv descuenta el primer flujo mensual en t=0 ---
+    vpn = vpn_vectorizado(tasa_descuento_anual / 12, flujos) + montos
+
+    # --- Periodo de recuperación: primer mes con acumulado >= 0 ---
+    recuperado = np.cumsum(flujos, axis=1) >= 0
+    recuperacion = pd.array(recuperado.argmax(axis=1) + 1, dtype="Int64")
+    recuperacion[~recuperado.any(axis=1)] = pd.NA
+
+    return pd.DataFrame({
+        "TIR (%)": np.round(tir_a * 100, 2),
+        "VPN ($)": np.round(vpn, 2),
+        "Periodo de Recuperación (meses)": recuperacion,
+    })
+
@@ -0,0 +1,168 @@
+# modules/cache.py
+"""Caché de resultados por escenario, direccionada por contenido.
+
+La clave es un hash canónico de los parámetros que afectan la amortización
+(monto, tasa, plazo, seguro, fechas y aportes).  Sobre esa clave se
+guardan el cronograma (con su tabla), las páginas de la tabla ya
+formateadas, los indicadores (junto con la tasa de descuento) y los
+gráficos, de modo que cambiar solo la TIO no vuelve a amortizar.
+
+Las entradas se expulsan por LRU y se llevan contadores de aciertos/fallos.
+Los objetos devueltos se comparten: quien los use no debe modificarlos.
+La app comparte una sola instancia entre sesiones (``st.cache_resource``),
+así que el diccionario se consulta y modifica bajo un candado; los cálculos
+corren fuera de él.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable
+
+import pandas as pd
+
+from modules.amortization import AmortizadorIncremental, normalizar_aportes
+from modules.indicators import calcular_indicadores, calcular_indicadores_fechas
+from modules.schedule import Cronograma
+from modules.totals import totales_cronograma
+from modules.viewer import FILAS_POR_PAGINA, pagina_tabla
+from modules.uvr import SerieUVR
+
+_FALTA = object()
+
+
+def clave_escenario(escenario: dict) -> str:
+    """Hash SHA-256 de la representación canónica del escenario."""
+    aportes = normalizar_aportes(dict(escenario))
+    canonico = {
+        "monto": float(escenario["monto"]),
+        "tasa": float(escenario["tasa"]),
+        "plazo": int(escenario["plazo"]),
+        "seguro": float(escenario["seguro"]),
+        "fecha_inicio": pd.Timestamp(escenario["fecha_inicio"]).date().isoformat(),
+        "regla_fecha": escenario.get("regla_fecha", "mismo_dia"),
+        "dia_habil": escenario.get("dia_habil"),
+        "denominacion": str(escenario.get("denominacion", "pesos")).lower(),
+        "serie_uvr": _texto_serie(escenario.get("serie_uvr")),
+        "inflacion": escenario.get("inflacion"),
+        "uvr_inicial": escenario.get("uvr_inicial"),
+        "sistema": escenario.get("sistema") or "frances",
+        "crecimiento": escenario.get("crecimiento"),
+        "aportes": [
+            [int(a["mes"]), float(a["monto"]), str(a.get("modo", "plazo"))]
+            for a in aportes
+        ],
+    }
+    texto = json.dumps(canonico, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(texto.encode("utf-8")).hexdigest()
+
+
+class CacheEscenarios:
+    """LRU de resultados por escenario con contadores de aciertos/fallos."""
+
+    def __init__(self, max_entradas: int = 128):
+        self.max_entradas = max_entradas
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._candado = threading.Lock()
+        # En un fallo, si solo cambiaron los aportes se reutiliza el tramo inicial
+        self._amortizador = AmortizadorIncremental()
+
+    def obtener(self, clave: Hashable, calcular: Callable[[], Any]) -> Any:
+        """Devuelve el valor guardado en ``clave`` o lo calcula y lo guarda.
+
+        Dos sesiones que fallen a la vez en la misma clave la calculan ambas;
+        queda la última.
+        """
+        with self._candado:
+            valor = self._entradas.get(clave, _FALTA)
+            if valor is not _FALTA:
+                self.aciertos += 1
+                self._entradas.move_to_end(clave)
+                return valor
+            self.fallos += 1
+
+        valor = calcular()
+        with self._candado:
+            self._entradas[clave] = valor
+            self._entradas.move_to_end(clave)
+            if len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+        return valor
+
+    def cronograma(self, escenario: dict) -> Cronograma:
+        clave = clave_escenario(escenario)
+        return self.obtener(("cronograma", clave),
+                            lambda: self._amortizador.cronograma(dict(escenario)))
+
+    def tabla(self, escenario: dict) -> pd.DataFrame:
+        # El DataFrame se arma una vez y queda guardado dentro del cronograma
+        return self.cronograma(escenario).to_frame()
+
+    def pagina(self, escenario: dict, pagina: int,
+               filas_por_pagina: int = FILAS_POR_PAGINA) -> pd.DataFrame:
+        """Página de la tabla ya redondeada para mostrar (``modules.viewer``)."""
+        clave = clave_escenario(escenario)
+        return self.obtener(
+            ("pagina", clave, int(pagina), int(filas_por_pagina)),
+            lambda: pagina_tabla(self.tabla(escenario), pagina, filas_por_pagina),
+        )
+
+    def indicadores(self, escenario: dict, tasa_descuento_anual: float) -> Dict[str, float]:
+        clave = clave_escenario(escenario)
+        return self.obtener(
+            ("indicadores", clave, float(tasa_descuento_anual)),
+            lambda: calcular_indicadores(self.tabla(escenario), tasa_descuento_anual),
+        )
+
+    def totales(self, escenario: dict, tasa_descuento_anual: float) -> Dict[str, float]:
+        """Totales e indicadores desde los arreglos del cronograma, sin la tabla."""
+        clave = clave_escenario(escenario)
+        return self.obtener(
+            ("totales", clave, float(tasa_descuento_anual)),
+            lambda: totales_cronograma(self.cronograma(escenario), tasa_descuento_anual),
+        )
+
+    def indicadores_fechas(self, escenario: dict, tasa_descuento_anual: float) -> Dict[str, float]:
+        clave = clave_escenario(escenario)
+        return self.obtener(
+            ("indicadores_fechas", clave, float(tasa_descuento_anual)),
+            lambda: calcular_indicadores_fechas(self.tabla(escenario), tasa_descuento_anual),
+        )
+
+    def grafico(self, nombre: str, escenario: dict, construir: Callable[[], Any]) -> Any:
+        """Gráfico ``nombre`` del escenario; ``construir`` solo corre en un fallo."""
+        return self.obtener(("grafico", nombre, clave_escenario(escenario)), construir)
+
+    def estadisticas(self) -> Dict[str, int]:
+        with self._candado:
+            return {
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+            }
+
+    def limpiar(self) -> None:
+        with self._candado:
+            self._entradas.clear()
+            self.aciertos = 0
+            self.fallos = 0
+
+
+# =========================
+# Ayudantes privados
+# =========================
+
+def _texto_serie(serie) -> str | None:
+    """Identifica la serie UVR de un escenario (ruta o ``SerieUVR`` en memoria)."""
+    if serie is None or isinstance(serie, str):
+        return serie
+    if isinstance(serie, SerieUVR):
+        huella = hashlib.sha256(serie.valores.tobytes()).hexdigest()
+        return f"{serie.inicio}:{huella}:{serie.inflacion_proyectada}"
+    return str(serie)
@@ -0,0 +1,97 @@
+# modules/checkpoint.py
+"""Manifiesto de avance para corridas por lotes reanudables.
+
+Cada escenario terminado se agrega como una línea JSON a
+``<carpeta_salida>/manifiesto.jsonl`` (escritura + ``fsync``), con su clave de
+contenido y los archivos que produjo.  Si la corrida se interrumpe, la
+siguiente con ``--reanudar`` omite la exportación de los escenarios cuya clave
+ya figura en el manifiesto y cuyos archivos siguen existiendo.
+
+La clave es ``clave_escenario``: si la fila del Excel cambia, el escenario se
+vuelve a procesar aunque tenga el mismo nombre.  Los escenarios que fallan
+también se registran (con ``error``) para dejar constancia, pero al reanudar
+se vuelven a intentar: el fallo pudo ser pasajero (archivo bloqueado, disco
+lleno) y solo se omite lo que terminó bien.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+NOMBRE_MANIFIESTO = "manifiesto.jsonl"
+
+
+class Manifiesto:
+    """Registro de escenarios terminados, solo por adición."""
+
+    def __init__(self, carpeta_salida: str | Path, reanudar: bool = True):
+        self.ruta = Path(carpeta_salida) / NOMBRE_MANIFIESTO
+        self.ruta.parent.mkdir(parents=True, exist_ok=True)
+        self.hechos: Dict[str, Dict] = self._leer() if reanudar else {}
+        # Una corrida nueva empieza con el manifiesto vacío
+        self._archivo = open(self.ruta, "a" if reanudar else "w", encoding="utf-8")
+        if reanudar and self._termina_a_medias():
+            self._archivo.write("\n")
+
+    def previo(self, clave: str) -> Optional[Dict]:
+        """Entrada registrada para ``clave`` si terminó bien y todos sus
+        archivos existen."""
+        entrada = self.hechos.get(clave)
+        if entrada is None or entrada.get("error"):
+            return None
+        if not all(os.path.exists(ruta) for ruta in entrada.get("archivos", [])):
+            return None
+        return entrada
+
+    def registrar(self, clave: str, nombre: str, archivos: List[str],
+                  pdf: Optional[str] = None, error: Optional[str] = None) -> None:
+        entrada = {
+            "clave": clave,
+            "nombre": nombre,
+            "archivos": archivos,
+            "pdf": pdf,
+            "fecha": datetime.now().isoformat(timespec="seconds"),
+        }
+        if error is not None:
+            entrada["error"] = error
+        self._archivo.write(json.dumps(entrada, ensure_ascii=False) + "\n")
+        self._archivo.flush()
+        os.fsync(self._archivo.fileno())
+        self.hechos[clave] = entrada
+
+    def cerrar(self) -> None:
+        self._archivo.close()
+
+    def __enter__(self) -> "Manifiesto":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+    # =========================
+    # Ayudantes privados
+    # =========================
+
+    def _leer(self) -> Dict[str, Dict]:
+        hechos: Dict[str, Dict] = {}
+        if not self.ruta.exists():
+            return hechos
+        with open(self.ruta, encoding="utf-8") as f:
+            for linea in f:
+                try:
+                    entrada = json.loads(linea)
+                except json.JSONDecodeError:
+                    continue  # última línea a medio escribir por una interrupción
+                hechos[entrada["clave"]] = entrada
+        return hechos
+
+    def _termina_a_medias(self) -> bool:
+        if self.ruta.stat().st_size == 0:
+            return False
+        with open(self.ruta, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) != b"\n"
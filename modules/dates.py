@@ -0,0 +1,105 @@
+# modules/dates.py
+"""Calendario de pagos con fechas reales.
+
+Reemplaza el avance de 30 días por mes (que se va desfasando de los meses de
+facturación) por un calendario mensual calculado de una sola vez como arreglo
+``datetime64[D]``:
+
+* ``regla="mismo_dia"``  – el mismo día del mes de ``fecha_inicio``; si el mes
+  es más corto se usa su último día (31-ene → 28/29-feb → 31-mar).
+* ``regla="fin_de_mes"`` – el último día de cada mes.
+
+Opcionalmente cada fecha se corre a un día hábil (``np.busday_offset``) con
+los festivos de Colombia de ``data/festivos_colombia.csv``:
+
+* ``"siguiente"``            – próximo día hábil.
+* ``"anterior"``             – día hábil anterior.
+* ``"siguiente_modificado"`` – próximo día hábil salvo que cambie de mes.
+
+Convención: la cuota del mes 1 vence en ``fecha_inicio`` (igual que la columna
+``Fecha`` de siempre) y el desembolso se ubica un mes antes.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+_RUTA_FESTIVOS = Path(__file__).resolve().parent.parent / "data" / "festivos_colombia.csv"
+
+_REGLAS = ("mismo_dia", "fin_de_mes")
+_AJUSTES = {
+    "siguiente": "forward",
+    "anterior": "backward",
+    "siguiente_modificado": "modifiedfollowing",
+}
+
+
+def calendario_pagos(
+    fecha_inicio,
+    plazo: int,
+    regla: str = "mismo_dia",
+    dia_habil: Optional[str] = None,
+    festivos: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Fechas de vencimiento de los meses 1..plazo (``datetime64[D]``).
+
+    ``festivos`` reemplaza la tabla local de Colombia cuando se ajusta a día
+    hábil (útil para otros países o para pruebas).
+    """
+    if regla not in _REGLAS:
+        raise ValueError(f"regla debe ser una de {_REGLAS}, no {regla!r}")
+
+    inicio = np.datetime64(pd.Timestamp(fecha_inicio).date(), "D")
+    meses = inicio.astype("datetime64[M]") + np.arange(plazo)
+    ultimo_dia = (meses + 1).astype("datetime64[D]") - 1
+
+    if regla == "fin_de_mes":
+        fechas = ultimo_dia
+    else:
+        dia = inicio - inicio.astype("datetime64[M]").astype("datetime64[D]")
+        fechas = np.minimum(meses.astype("datetime64[D]") + dia, ultimo_dia)
+
+    if dia_habil is not None:
+        fechas = ajustar_dia_habil(fechas, dia_habil, festivos)
+    return fechas
+
+
+def fecha_desembolso(fecha_inicio, regla: str = "mismo_dia") -> np.datetime64:
+    """Un mes antes de la primera cuota, con la misma regla de día."""
+    if regla not in _REGLAS:
+        raise ValueError(f"regla debe ser una de {_REGLAS}, no {regla!r}")
+    inicio = np.datetime64(pd.Timestamp(fecha_inicio).date(), "D")
+    mes = inicio.astype("datetime64[M]") - 1
+    ultimo_dia = (mes + 1).astype("datetime64[D]") - 1
+    if regla == "fin_de_mes":
+        return ultimo_dia
+    dia = inicio - inicio.astype("datetime64[M]").astype("datetime64[D]")
+    return min(mes.astype("datetime64[D]") + dia, ultimo_dia)
+
+
+def ajustar_dia_habil(fechas: np.ndarray, ajuste: str = "siguiente",
+                      festivos: Optional[np.ndarray] = None) -> np.ndarray:
+    """Corre cada fecha a un día hábil (lunes a viernes sin festivos)."""
+    if ajuste not in _AJUSTES:
+        raise ValueError(f"ajuste debe ser uno de {tuple(_AJUSTES)}, no {ajuste!r}")
+    if festivos is None:
+        festivos = festivos_colombia()
+    return np.busday_offset(np.asarray(fechas, dtype="datetime64[D]"), 0,
+                            roll=_AJUSTES[ajuste], holidays=festivos)
+
+
+@lru_cache(maxsize=1)
+def festivos_colombia() -> np.ndarray:
+    """Festivos de Colombia (Ley 51 de 1983) leídos de la tabla local."""
+    tabla = pd.read_csv(_RUTA_FESTIVOS, usecols=["fecha"])
+    return np.unique(tabla["fecha"].to_numpy(dtype="datetime64[D]"))
+
+
+def fechas_de_tabla(df_amortizacion: pd.DataFrame) -> np.ndarray:
+    """Columna ``Fecha`` de una tabla de amortización como ``datetime64[D]``."""
+    return pd.to_datetime(df_amortizacion["Fecha"]).to_numpy(dtype="datetime64[D]")
@@ -3,6 +3,11 @@
     1. Un archivo Excel con estructura tabular, estilos y un apartado de decisiones.
     2. Un CSV con la tabla de amortización lisa (sin estilo) para ingestión rápida.
 
+El Excel se escribe por defecto en modo ``streaming``
+(``Workbook(write_only=True)``): las filas van en una sola pasada y los anchos
+de columna se calculan desde el DataFrame, sin recorrer celda por celda.  El
+camino clásico (``streaming=False``) queda como referencia.
+
 Pensado para ser la única dependencia de salida tabular.  Más adelante podremos
 inyectar aquí funciones para embellecer el archivo (formatos condicionales,
 colores corporativos, fórmulas avanzadas, etc.).  Por ahora la prioridad es
@@ -12,11 +17,16 @@ una base sólida y editable.
 from __future__ import annotations
 
 import os
+import re
+import warnings
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional, Tuple
 
+import numpy as np
 import pandas as pd
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
 from openpyxl.utils.dataframe import dataframe_to_rows
 from openpyxl.worksheet.table import Table, TableStyleInfo
 from openpyxl.styles import Font, Alignment
@@ -30,6 +40,28 @@ _TABLE_STYLE = TableStyleInfo(
     name="TableStyleMedium9", showRowStripes=True, showColumnStripes=False
 )
 
+# Estilos reutilizados por el modo streaming (se crean una sola vez)
+_FUENTE_NEGRITA = Font(bold=True)
+_ALINEACION_CENTRO = Alignment(horizontal="center")
+_ALINEACION_AJUSTE = Alignment(wrap_text=True)
+
+_CABECERA_DECISIONES = [
+    "Escenario",
+    "TIR (%)",
+    "VPN ($)",
+    "Periodo de Recuperación (meses)",
+    "Clasificación",
+]
+
+# Caracteres que Excel no admite en nombres de hoja
+_CARACTERES_HOJA = re.compile(r"[\[\]:*?/\\]")
+
+_NOTAS_GLOSARIO = [
+    ("Favorable", "VPN positivo, TIR por encima del costo de capital, corto periodo de recuperación."),
+    ("Intermedio", "Mixto: uno o dos indicadores aceptables pero con reservas. Requiere análisis cualitativo."),
+    ("Poco favorable", "VPN negativo y/o TIR baja, periodo de recuperación muy largo.")
+]
+
 # Reglas simplificadas para clasificar escenarios
 # (ajusta los umbrales a tu criterio empresarial)
 _DEFAULT_RULES = {
@@ -49,16 +81,30 @@ def exportar_excel(
     indicadores: Dict[str, float | int | None],
     nombre_escenario: str,
     reglas: Optional[Dict[str, callable]] = None,
+    streaming: bool = True,
 ) -> None:
     """Genera un archivo Excel con tres hojas:
 
     Amortización   – Tabla estructurada con estilo.
     Indicadores    – Indicadores clave + campos reservados.
     Decisiones     – Clasificación del escenario y glosario.
+
+    Por defecto (``streaming=True``) el libro se escribe en modo
+    solo-escritura: mismo contenido y estilos que ``streaming=False``, pero
+    sin mantener las hojas completas en memoria.
     """
 
     reglas = reglas or _DEFAULT_RULES
 
+    if streaming:
+        wb = Workbook(write_only=True)
+        _hoja_amortizacion_streaming(wb, "Amortización", df_amort, "TablaAmortizacion")
+        _hoja_indicadores_streaming(wb, "Indicadores", nombre_escenario, indicadores)
+        _hoja_decisiones_streaming(wb, "Decisiones",
+                                   [_fila_decision(nombre_escenario, indicadores, reglas)])
+        _guardar(wb, ruta_salida)
+        return
+
     # --------------------------
     # Crear libro / hoja 1 (amortización)
     # --------------------------
@@ -109,28 +155,13 @@ def exportar_excel(
     # --------------------------
     ws_dec = wb.create_sheet("Decisiones")
 
-    cabecera = [
-        "Escenario",
-        "TIR (%)",
-        "VPN ($)",
-        "Periodo de Recuperación (meses)",
-        "Clasificación",
-    ]
-    ws_dec.append(cabecera)
+    ws_dec.append(_CABECERA_DECISIONES)
     for cell in ws_dec[1]:
         cell.font = Font(bold=True)
         cell.alignment = Alignment(horizontal="center")
 
     # Clasificación según reglas
-    clasificacion = _clasificar(indicadores, reglas)
-
-    ws_dec.append([
-        nombre_escenario,
-        indicadores.get("TIR (%)"),
-        indicadores.get("VPN ($)"),
-        indicadores.get("Periodo de Recuperación (meses)"),
-        clasificacion.title().replace("_", " "),
-    ])
+    ws_dec.append(_fila_decision(nombre_escenario, indicadores, reglas))
 
     # Ancho de columnas
     for col in ws_dec.columns:
@@ -147,9 +178,63 @@ def exportar_excel(
     # --------------------------
     # Salvar workbook
     # --------------------------
-    ruta_salida = Path(ruta_salida)
-    ruta_salida.parent.mkdir(parents=True, exist_ok=True)
-    wb.save(ruta_salida)
+    _guardar(wb, ruta_salida)
+
+
+class LibroConsolidado:
+    """Un solo libro Excel para muchos escenarios, escrito en streaming.
+
+    Resumen        – Indicadores y clasificación de todos los escenarios + glosario.
+    <escenario>    – Una hoja por escenario con su tabla de amortización.
+
+    Las hojas de escenario se escriben a medida que se agregan; del escenario
+    solo se conservan los indicadores para armar el resumen al cerrar.
+    Los estilos se crean una sola vez para todo el libro.
+    """
+
+    def __init__(self, ruta_salida: str | Path, reglas: Optional[Dict[str, callable]] = None):
+        self.ruta_salida = ruta_salida
+        self.reglas = reglas or _DEFAULT_RULES
+        self._wb = Workbook(write_only=True)
+        # El resumen se crea primero (queda como primera hoja) y se llena al cerrar
+        self._ws_resumen = self._wb.create_sheet("Resumen")
+        self._hojas_usadas = {"resumen"}
+        self._indicadores: list = []
+
+    def agregar(self, nombre_escenario: str, df_amort: pd.DataFrame,
+                indicadores: Dict[str, float | int | None]) -> None:
+        titulo = _nombre_hoja(nombre_escenario, self._hojas_usadas)
+        nombre_tabla = f"TablaAmortizacion{len(self._indicadores) + 1}"
+        _hoja_amortizacion_streaming(self._wb, titulo, df_amort, nombre_tabla)
+        self._indicadores.append((nombre_escenario, dict(indicadores)))
+
+    def cerrar(self) -> None:
+        claves = list(dict.fromkeys(k for _, ind in self._indicadores for k in ind))
+        cabecera = ["Escenario", *claves, "Clasificación"]
+        filas = [
+            [nombre, *(ind.get(k) for k in claves), _etiqueta_clasificacion(ind, self.reglas)]
+            for nombre, ind in self._indicadores
+        ]
+        _escribir_decisiones(self._ws_resumen, filas, cabecera)
+        _guardar(self._wb, self.ruta_salida)
+
+    def __enter__(self) -> "LibroConsolidado":
+        return self
+
+    def __exit__(self, tipo_exc, *exc) -> None:
+        if tipo_exc is None:
+            self.cerrar()
+
+
+def exportar_excel_consolidado(
+    ruta_salida: str | Path,
+    resultados: Iterable[Tuple[str, pd.DataFrame, Dict[str, float | int | None]]],
+    reglas: Optional[Dict[str, callable]] = None,
+) -> None:
+    """Escribe ``(nombre, df_amort, indicadores)`` de todos los escenarios en un libro."""
+    with LibroConsolidado(ruta_salida, reglas) as libro:
+        for nombre, df_amort, indicadores in resultados:
+            libro.agregar(nombre, df_amort, indicadores)
 
 
 def exportar_csv(ruta_csv: str | Path, df_amort: pd.DataFrame) -> None:
@@ -176,14 +261,30 @@ def _clasificar(indicadores: Dict[str, float | int | None], reglas) -> str:
     return "intermedio"
 
 
+def _fila_decision(nombre_escenario: str, indicadores: Dict[str, float | int | None], reglas) -> list:
+    """Fila de la hoja Decisiones con la clasificación según reglas."""
+    return [
+        nombre_escenario,
+        indicadores.get("TIR (%)"),
+        indicadores.get("VPN ($)"),
+        indicadores.get("Periodo de Recuperación (meses)"),
+        _etiqueta_clasificacion(indicadores, reglas),
+    ]
+
+
+def _etiqueta_clasificacion(indicadores: Dict[str, float | int | None], reglas) -> str:
+    return _clasificar(indicadores, reglas).title().replace("_", " ")
+
+
+def _guardar(wb: Workbook, ruta_salida: str | Path) -> None:
+    ruta_salida = Path(ruta_salida)
+    ruta_salida.parent.mkdir(parents=True, exist_ok=True)
+    wb.save(ruta_salida)
+
+
 def _insert_glosario(ws, start_row: int):
     """Inserta texto descriptivo en la hoja de decisiones."""
-    notas = [
-        ("Favorable", "VPN positivo, TIR por encima del costo de capital, corto periodo de recuperación."),
-        ("Intermedio", "Mixto: uno o dos indicadores aceptables pero con reservas. Requiere análisis cualitativo."),
-        ("Poco favorable", "VPN negativo y/o TIR baja, periodo de recuperación muy largo.")
-    ]
-    for i, (titulo, descripcion) in enumerate(notas, start=0):
+    for i, (titulo, descripcion) in enumerate(_NOTAS_GLOSARIO, start=0):
         fila = start_row + i
         ws[f"A{fila}"] = titulo
         ws[f"A{fila}"].font = Font(bold=True)
@@ -191,6 +292,106 @@ def _insert_glosario(ws, start_row: int):
         ws[f"B{fila}"].alignment = Alignment(wrap_text=True)
 
 
+# ---------- Modo streaming (write_only) ----------
+
+def _celda(ws, valor, fuente=None, alineacion=None) -> WriteOnlyCell:
+    celda = WriteOnlyCell(ws, value=valor)
+    if fuente is not None:
+        celda.font = fuente
+    if alineacion is not None:
+        celda.alignment = alineacion
+    return celda
+
+
+def _anchos_columnas(df: pd.DataFrame) -> list:
+    """Ancho por columna = texto más largo (encabezado o valor) + 2.
+
+    Se calcula sobre los arreglos del DataFrame en bloque; los nulos no cuentan.
+    """
+    anchos = []
+    for col in df.columns:
+        serie = df[col]
+        valores = serie.to_numpy()[serie.notna().to_numpy()]
+        largo = len(str(col))
+        if valores.size:
+            largo = max(largo, int(np.char.str_len(valores.astype(str)).max()))
+        anchos.append(largo + 2)
+    return anchos
+
+
+def _fijar_anchos(ws, anchos: list) -> None:
+    for i, ancho in enumerate(anchos, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = ancho
+
+
+def _hoja_amortizacion_streaming(wb: Workbook, titulo: str, df_amort: pd.DataFrame,
+                                 nombre_tabla: str) -> None:
+    ws = wb.create_sheet(titulo)
+    # En write_only los anchos deben fijarse antes de escribir filas
+    _fijar_anchos(ws, _anchos_columnas(df_amort))
+
+    cabecera = [str(c) for c in df_amort.columns]
+    ws.append([_celda(ws, c, _FUENTE_NEGRITA) for c in cabecera])
+    columnas = [df_amort[c].tolist() for c in df_amort.columns]
+    for fila in zip(*columnas):
+        ws.append(fila)
+
+    # Tabla formal; en write_only las columnas de la tabla se declaran a mano
+    ref = f"A1:{get_column_letter(len(cabecera))}{len(df_amort) + 1}"
+    tabla = Table(ref=ref, displayName=nombre_tabla, tableStyleInfo=_TABLE_STYLE)
+    tabla._initialise_columns()
+    for columna, nombre in zip(tabla.tableColumns, cabecera):
+        columna.name = nombre
+    with warnings.catch_warnings():
+        # openpyxl avisa siempre en write_only aunque las columnas ya estén
+        warnings.simplefilter("ignore", UserWarning)
+        ws.add_table(tabla)
+
+
+def _hoja_indicadores_streaming(wb: Workbook, titulo: str, nombre_escenario: str,
+                                indicadores: Dict[str, float | int | None]) -> None:
+    ws = wb.create_sheet(titulo)
+    ws.append([_celda(ws, "Escenario:", _FUENTE_NEGRITA), nombre_escenario])
+    ws.append([])
+    for k, v in indicadores.items():
+        ws.append([_celda(ws, k, _FUENTE_NEGRITA), v])
+    ws.append([])
+    ws.append([_celda(ws, "Punto de Equilibrio ($)", _FUENTE_NEGRITA), ""])
+
+
+def _hoja_decisiones_streaming(wb: Workbook, titulo: str, filas: list) -> None:
+    _escribir_decisiones(wb.create_sheet(titulo), filas, _CABECERA_DECISIONES)
+
+
+def _escribir_decisiones(ws, filas: list, cabecera: list) -> None:
+    """Cabecera + una fila por escenario + glosario (hoja write_only vacía)."""
+    _fijar_anchos(ws, _anchos_columnas(pd.DataFrame(filas, columns=cabecera)))
+
+    ws.append([_celda(ws, c, _FUENTE_NEGRITA, _ALINEACION_CENTRO) for c in cabecera])
+    for fila in filas:
+        ws.append(fila)
+
+    # Pequeño glosario / guía de interpretación debajo
+    ws.append([])
+    ws.append([])
+    ws.append([_celda(ws, "Guía de interpretación:", _FUENTE_NEGRITA)])
+    for titulo_nota, descripcion in _NOTAS_GLOSARIO:
+        ws.append([_celda(ws, titulo_nota, _FUENTE_NEGRITA),
+                   _celda(ws, descripcion, alineacion=_ALINEACION_AJUSTE)])
+
+
+def _nombre_hoja(nombre: str, usados: set) -> str:
+    """Nombre de hoja válido para Excel (31 caracteres, sin []:*?/\\) y único."""
+    base = _CARACTERES_HOJA.sub("_", str(nombre)).strip("'")[:31] or "Escenario"
+    titulo, n = base, 2
+    while titulo.lower() in usados:
+        sufijo = f" ({n})"
+        titulo = base[:31 - len(sufijo)] + sufijo
+        n += 1
+    usados.add(titulo.lower())
+    return titulo
+
+
 # ==================================
 # Ejemplo de uso rápido (solo tests)
 # ==================================
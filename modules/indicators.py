@@ -1,7 +1,10 @@
 # indicators.py
-import numpy_financial as npf
+import numpy as np
 import pandas as pd
-from typing import Dict
+from typing import Dict, Optional
+
+from modules.dates import fecha_desembolso, fechas_de_tabla
+from modules.irr import tir, vpn, xtir
 
 def calcular_indicadores(df_amortizacion: pd.DataFrame,
                           tasa_descuento_anual: float) -> Dict[str, float]:
@@ -15,32 +18,115 @@ def calcular_indicadores(df_amortizacion: pd.DataFrame,
     ----------
     df_amortizacion : DataFrame con la tabla de amortización
     tasa_descuento_anual : float  (EA en decimal, p. ej. 0.1095 para 10.95 %)
+
+    Las versiones por días reales (XIRR/XNPV) están en
+    ``calcular_indicadores_fechas``.
     """
     # --- Flujo inicial positivo (monto del préstamo) ---
-    monto_inicial = df_amortizacion.iloc[0]["Saldo ($)"] + \
-                    df_amortizacion.iloc[0]["Amortización ($)"]
+    monto_inicial = monto_desembolsado(df_amortizacion)
+    return indicadores_desde_flujos(monto_inicial, df_amortizacion["Flujo ($)"].to_numpy(dtype=float),
+                                    tasa_descuento_anual,
+                                    _tasa_mensual_credito(df_amortizacion, monto_inicial))
+
+
+def indicadores_desde_flujos(monto_inicial: float, flujos: np.ndarray,
+                             tasa_descuento_anual: float,
+                             tasa_mensual_credito: float = 0.01) -> Dict[str, float]:
+    """``calcular_indicadores`` a partir del monto y los flujos mensuales.
 
-    flujos = [monto_inicial] + df_amortizacion["Flujo ($)"].tolist()
+    Sirve para quien ya tiene los arreglos del motor (``Cronograma``) y no
+    quiere armar la tabla.  ``tasa_mensual_credito`` es el arranque de Newton.
+    """
+    flujos = np.asarray(flujos, dtype=float)
 
-    # --- TIR (irr) ---
-    tir_m = npf.irr(flujos)          # mensual
-    tir_a = (1 + tir_m) ** 12 - 1 if tir_m is not None else None
+    # --- TIR (Newton arrancando desde la tasa mensual del crédito) ---
+    tir_m = tir(np.concatenate(([monto_inicial], flujos)), estimado=tasa_mensual_credito)
+    tir_a = None if np.isnan(tir_m) else (1 + tir_m) ** 12 - 1
 
     # --- VPN ---
     tasa_m_desc = tasa_descuento_anual / 12
-    vpn = npf.npv(tasa_m_desc, flujos[1:]) + flujos[0]
+    valor_presente = vpn(tasa_m_desc, flujos) + monto_inicial
 
     # --- Periodo de recuperación ---
-    acumulado = 0
-    recuperacion = None
-    for i, f in enumerate(flujos[1:], start=1):
-        acumulado += f
-        if acumulado >= 0:
-            recuperacion = i
-            break
+    recuperacion = mes_recuperacion(np.cumsum(flujos))
 
     return {
         "TIR (%)": None if tir_a is None else round(tir_a * 100, 2),
-        "VPN ($)": round(vpn, 2),
+        "VPN ($)": round(valor_presente, 2),
         "Periodo de Recuperación (meses)": recuperacion
     }
+
+
+def calcular_indicadores_fechas(df_amortizacion: pd.DataFrame,
+                                tasa_descuento_anual: float) -> Dict[str, Optional[float]]:
+    """
+    Indicadores por fechas reales, complementarios a ``calcular_indicadores``:
+        - XTIR (%)                            : TIR efectiva anual por días (XIRR)
+        - XVPN ($)                            : VPN por días a la fecha del desembolso (XNPV)
+        - Payback Descontado por Fechas (meses): primer mes con XVPN acumulado >= 0
+
+    Los factores de descuento se calculan una sola vez como arreglo
+    (actual/365 sobre la tasa EA) y de ahí salen el XVPN (suma) y el payback
+    (``cumsum`` + ``searchsorted``).  El desembolso se ubica un mes antes de
+    la primera cuota.
+    """
+    monto_inicial = monto_desembolsado(df_amortizacion)
+    flujos = np.concatenate(([monto_inicial], df_amortizacion["Flujo ($)"].to_numpy(dtype=float)))
+
+    cuotas = fechas_de_tabla(df_amortizacion)
+    fechas = np.concatenate(([fecha_desembolso(cuotas[0])], cuotas))
+    anios = (fechas - fechas[0]).astype(float) / 365.0
+
+    descontados = flujos * (1.0 + tasa_descuento_anual) ** -anios
+    acumulado = np.cumsum(descontados)
+
+    tasa_m_credito = _tasa_mensual_credito(df_amortizacion, monto_inicial)
+    tir_a = xtir(flujos, fechas, estimado=(1 + tasa_m_credito) ** 12 - 1)
+
+    return {
+        "XTIR (%)": None if np.isnan(tir_a) else round(tir_a * 100, 2),
+        "XVPN ($)": round(float(acumulado[-1]), 2),
+        "Payback Descontado por Fechas (meses)": mes_recuperacion(acumulado[1:]),
+    }
+
+
+def flujos_con_aportes(flujo: np.ndarray, cuota: np.ndarray, seguro: float,
+                       aporte: np.ndarray, aporte_aplicado: np.ndarray) -> np.ndarray:
+    """Flujo mensual contando como salida todos los aportes.
+
+    «Flujo ($)» solo resta los aportes con reducción de plazo; los de
+    reducción de cuota también salen del bolsillo del deudor y, sin
+    contarlos, un optimizador los vería gratis.
+    """
+    return np.where(aporte_aplicado, -(cuota + seguro + np.nan_to_num(aporte)), flujo)
+
+
+def monto_desembolsado(df_amortizacion: pd.DataFrame) -> float:
+    """Monto del préstamo reconstruido desde la primera fila de la tabla.
+
+    En créditos en UVR el saldo del mes 1 ya incluye la corrección monetaria,
+    que se descuenta para volver a los pesos del desembolso.
+    """
+    fila = df_amortizacion.iloc[0]
+    monto = fila["Saldo ($)"] + fila["Amortización ($)"]
+    if "Corrección Monetaria ($)" in df_amortizacion.columns:
+        monto -= fila["Corrección Monetaria ($)"]
+    return monto
+
+
+def mes_recuperacion(acumulado: np.ndarray) -> Optional[int]:
+    """Primer mes (1-based) con acumulado >= 0, o None si nunca se alcanza.
+
+    El máximo acumulado es monótono, así que el mes sale de un ``searchsorted``.
+    """
+    acumulado = np.asarray(acumulado, dtype=float)
+    if acumulado.size == 0:
+        return None
+    indice = int(np.searchsorted(np.maximum.accumulate(acumulado), 0.0, side="left"))
+    return indice + 1 if indice < acumulado.size else None
+
+
+def _tasa_mensual_credito(df_amortizacion: pd.DataFrame, monto_inicial: float) -> float:
+    """Tasa mensual implícita en el primer mes; punto de arranque para la TIR."""
+    interes = df_amortizacion.iloc[0]["Interés ($)"]
+    return interes / monto_inicial if monto_inicial else 0.01
@@ -1,112 +1,209 @@
 import pandas as pd
 import streamlit as st
-from typing import Optional, List, Dict
+from datetime import date, datetime
+from openpyxl import load_workbook
+from typing import Optional, List, Dict, Iterator
+
+# Mapear posibles nombres de columna a nombres internos
+_COLUMNAS = {
+    "nombre":           "nombre",
+    "escenario":        "nombre",
+    "monto":            "monto",
+    "tasa":             "tasa",
+    "tasa (%)":         "tasa",
+    "plazo":            "plazo",
+    "seguro":           "seguro",
+    "fecha inicio":     "fecha_inicio",
+    "fecha":            "fecha_inicio",
+    "mes aporte":       "mes_aporte",
+    "monto aporte":     "monto_aporte",
+    "modo aporte":      "modo_aporte",
+    "tipo reduccion":   "modo_aporte",
+    "denominación":     "denominacion",
+    "moneda":           "denominacion",
+    "inflación":        "inflacion",
+    "serie uvr":        "serie_uvr",
+    "uvr inicial":      "uvr_inicial",
+    "sistema amortizacion": "sistema",
+    "sistema amortización": "sistema",
+}
+
+_REQUERIDAS = {"nombre", "monto", "tasa", "plazo", "seguro", "fecha_inicio"}
+
+_MAX_APORTES = 10
+
 
 def leer_escenarios_desde_excel(
     ruta_excel: str,
     hoja: Optional[str] = None
 ) -> List[Dict]:
+    escenarios = list(iterar_escenarios_desde_excel(ruta_excel, hoja))
+    if not escenarios:
+        st.error("No se encontró ningún escenario válido.")
+    return escenarios
+
+
+def iterar_escenarios_desde_excel(
+    ruta_excel: str,
+    hoja: Optional[str] = None
+) -> Iterator[Dict]:
+    """Lee el libro en modo solo-lectura y entrega un escenario por fila.
+
+    Las celdas llegan ya tipadas desde openpyxl (números, fechas), así que no
+    se pasa por texto.  La memoria no crece con el número de filas y quien
+    consume el generador puede amortizar cada escenario apenas se lee.
+    Las filas inválidas se reportan con ``st.warning`` y se omiten.
+    """
     # 1) Abrir libro y decidir hoja
     try:
-        xls = pd.ExcelFile(ruta_excel)
+        wb = load_workbook(ruta_excel, read_only=True, data_only=True)
     except Exception as e:
         st.error(f"❌ No pude abrir el archivo: {e}")
-        return []
-    hojas = xls.sheet_names
-    if hoja in hojas:
-        hoja_a_leer = hoja
-    else:
-        if hoja:
-            st.warning(f"⚠️ Hoja «{hoja}» no existe; usando «{hojas[0]}»")
-        hoja_a_leer = hojas[0]
-
-    # 2) Leer DataFrame completo como strings
+        return
+
     try:
-        df = pd.read_excel(xls, sheet_name=hoja_a_leer, dtype=str)
-    except Exception as e:
-        st.error(f"❌ Error al leer la hoja «{hoja_a_leer}»: {e}")
-        return []
-
-    # 3) Normalizar encabezados
-    df.columns = df.columns.str.strip().str.lower()
-
-    # 4) Mapear posibles nombres de columna a nombres internos
-    columnas = {
-        "nombre":           "nombre",
-        "escenario":        "nombre",
-        "monto":            "monto",
-        "tasa":             "tasa",
-        "tasa (%)":         "tasa",
-        "plazo":            "plazo",
-        "seguro":           "seguro",
-        "fecha inicio":     "fecha_inicio",
-        "fecha":            "fecha_inicio",
-        "mes aporte":       "mes_aporte",
-        "monto aporte":     "monto_aporte",
-        "modo aporte":      "modo_aporte",
-        "tipo reduccion":   "modo_aporte",
-    }
-    df = df.rename(columns={k: v for k, v in columnas.items() if k in df.columns})
-
-    # 5) Validar que existan las columnas mínimas
-    requeridas = {"nombre","monto","tasa","plazo","seguro","fecha_inicio"}
-    if not requeridas.issubset(df.columns):
-        faltan = requeridas - set(df.columns)
-        st.error("❌ Faltan columnas: " + ", ".join(faltan))
-        return []
-
-    # 6) Construir la lista de escenarios
-    escenarios: List[Dict] = []
-    for i, row in df.iterrows():
+        hojas = wb.sheetnames
+        if hoja in hojas:
+            hoja_a_leer = hoja
+        else:
+            if hoja:
+                st.warning(f"⚠️ Hoja «{hoja}» no existe; usando «{hojas[0]}»")
+            hoja_a_leer = hojas[0]
+
+        filas = wb[hoja_a_leer].iter_rows(values_only=True)
+
+        # 2) Normalizar encabezados y ubicar cada columna una sola vez
+        encabezado = next(filas, None) or ()
+        posiciones: Dict[str, int] = {}
+        for pos, celda in enumerate(encabezado):
+            if celda is None:
+                continue
+            nombre = str(celda).strip().lower()
+            posiciones.setdefault(_COLUMNAS.get(nombre, nombre), pos)
+
+        # 3) Validar que existan las columnas mínimas
+        if not _REQUERIDAS.issubset(posiciones):
+            faltan = _REQUERIDAS - set(posiciones)
+            st.error("❌ Faltan columnas: " + ", ".join(faltan))
+            return
+
+        # Columnas de aportes múltiples presentes en la hoja: (mes, monto, modo)
+        columnas_aporte = [
+            (posiciones[f"mes_aporte_{j}"], posiciones[f"monto_aporte_{j}"],
+             posiciones.get(f"modo_aporte_{j}"))
+            for j in range(1, _MAX_APORTES + 1)
+            if f"mes_aporte_{j}" in posiciones and f"monto_aporte_{j}" in posiciones
+        ]
+
+        # 4) Construir los escenarios fila por fila
+        for numero_fila, valores in enumerate(filas, start=2):
+            if all(_vacio(v) for v in valores):
+                continue
+            try:
+                esc = _parsear_fila(valores, posiciones, columnas_aporte, numero_fila)
+            except Exception as e:
+                st.warning(f"Fila {numero_fila}: {e}")
+                continue
+            yield esc
+    finally:
+        wb.close()
+
+
+# =========================
+# Ayudantes privados
+# =========================
+
+def _parsear_fila(valores: tuple, posiciones: Dict[str, int],
+                  columnas_aporte: list, numero_fila: int) -> Dict:
+    def celda(nombre):
+        pos = posiciones.get(nombre)
+        return valores[pos] if pos is not None and pos < len(valores) else None
+
+    nombre = str(celda("nombre")).strip()
+    monto = _a_float(celda("monto"))
+
+    # Extraer aportes múltiples si existen
+    aportes = []
+    for pos_mes, pos_monto, pos_modo in columnas_aporte:
         try:
-            # Extraer aportes múltiples si existen
-            aportes = []
-            for j in range(1, 11):
-                mes_col = f"mes_aporte_{j}"
-                monto_col = f"monto_aporte_{j}"
-                modo_col = f"modo_aporte_{j}"
-
-                if mes_col in row and monto_col in row:
-                    try:
-                        mes = int(float(row[mes_col]))
-                        monto = float(row[monto_col])
-                        modo = str(row.get(modo_col, "plazo")).strip().lower()
-                        if mes > 0 and monto > 0:
-                            aportes.append({"mes": mes, "monto": monto, "modo": modo})
-                    except Exception:
-                        continue
-
-            # Si no hay lista múltiple, usar aporte único (retrocompatibilidad)
-            if not aportes and not pd.isna(row.get("mes_aporte")):
-                aportes.append({
-                    "mes": int(float(row["mes_aporte"])),
-                    "monto": float(row.get("monto_aporte", 0)),
-                    "modo": str(row.get("modo_aporte", "plazo")).strip().lower()
-                })
-
-            # Validaciones
-            meses = [a["mes"] for a in aportes]
-            if len(meses) != len(set(meses)):
-                st.warning(f"Fila {i + 2}: Meses de aporte duplicados en el escenario «{row['nombre']}».")
-            for a in aportes:
-                if a["monto"] > float(row["monto"]):
-                    st.warning(
-                        f"Fila {i + 2}: El aporte de ${a['monto']:,.0f} excede el monto del préstamo en «{row['nombre']}».")
-
-            esc = {
-                "nombre": str(row["nombre"]).strip(),
-                "monto": float(row["monto"]),
-                "tasa": float(row["tasa"]),
-                "plazo": int(float(row["plazo"])),
-                "seguro": float(row["seguro"]),
-                "fecha_inicio": pd.to_datetime(row["fecha_inicio"]).date(),
-                "aportes": aportes
-            }
-            escenarios.append(esc)
-        except Exception as e:
-            st.warning(f"Fila {i + 2}: {e}")
+            mes = _a_entero(valores[pos_mes])
+            monto_aporte = _a_float(valores[pos_monto])
+            modo = _a_modo(valores[pos_modo] if pos_modo is not None else None)
+        except (TypeError, ValueError, IndexError):
+            continue
+        if mes > 0 and monto_aporte > 0:
+            aportes.append({"mes": mes, "monto": monto_aporte, "modo": modo})
+
+    # Si no hay lista múltiple, usar aporte único (retrocompatibilidad)
+    if not aportes and not _vacio(celda("mes_aporte")):
+        monto_unico = celda("monto_aporte")
+        aportes.append({
+            "mes": _a_entero(celda("mes_aporte")),
+            "monto": 0.0 if _vacio(monto_unico) else _a_float(monto_unico),
+            "modo": _a_modo(celda("modo_aporte")),
+        })
+
+    # Validaciones
+    meses = [a["mes"] for a in aportes]
+    if len(meses) != len(set(meses)):
+        st.warning(f"Fila {numero_fila}: Meses de aporte duplicados en el escenario «{nombre}».")
+    for a in aportes:
+        if a["monto"] > monto:
+            st.warning(
+                f"Fila {numero_fila}: El aporte de ${a['monto']:,.0f} excede el monto del préstamo en «{nombre}».")
+
+    escenario = {
+        "nombre": nombre,
+        "monto": monto,
+        "tasa": _a_float(celda("tasa")),
+        "plazo": _a_entero(celda("plazo")),
+        "seguro": _a_float(celda("seguro")),
+        "fecha_inicio": _a_fecha(celda("fecha_inicio")),
+        "aportes": aportes
+    }
+
+    # Sistema de amortización (columnas opcionales; por defecto francés)
+    if not _vacio(celda("sistema")):
+        escenario["sistema"] = str(celda("sistema")).strip().lower().replace(" ", "_")
+        if not _vacio(celda("crecimiento")):
+            escenario["crecimiento"] = _a_float(celda("crecimiento"))
+
+    # Créditos en UVR (columnas opcionales)
+    if str(celda("denominacion") or "").strip().lower() == "uvr":
+        escenario["denominacion"] = "uvr"
+        if not _vacio(celda("serie_uvr")):
+            escenario["serie_uvr"] = str(celda("serie_uvr")).strip()
+        for clave in ("inflacion", "uvr_inicial"):
+            if not _vacio(celda(clave)):
+                escenario[clave] = _a_float(celda(clave))
+    return escenario
+
+
+def _vacio(valor) -> bool:
+    return valor is None or (isinstance(valor, str) and not valor.strip())
+
+
+def _a_float(valor) -> float:
+    if _vacio(valor):
+        raise ValueError("valor vacío")
+    if isinstance(valor, str):
+        valor = valor.strip()
+    return float(valor)
+
+
+def _a_entero(valor) -> int:
+    return int(_a_float(valor))
+
+
+def _a_modo(valor) -> str:
+    return "plazo" if _vacio(valor) else str(valor).strip().lower()
 
-    if not escenarios:
-        st.error("No se encontró ningún escenario válido.")
-    return escenarios
 
+def _a_fecha(valor) -> date:
+    if isinstance(valor, datetime):
+        return valor.date()
+    if isinstance(valor, date):
+        return valor
+    if _vacio(valor):
+        raise ValueError("fecha de inicio vacía")
+    return pd.to_datetime(valor).date()
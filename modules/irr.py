@@ -0,0 +1,188 @@
+# modules/irr.py
+"""Solucionador de TIR/VPN para flujos de crédito.
+
+``numpy_financial.irr`` obtiene todas las raíces del polinomio con un
+problema de valores propios, cuyo costo crece aproximadamente con el cubo del
+número de períodos.  Aquí se usa Newton arrancando desde la tasa del crédito
+(que para flujos hipotecarios está muy cerca de la TIR) y, si Newton no
+converge, bisección sobre un intervalo que encierre el cambio de signo.
+
+Convención de flujos: ``flujos[0]`` ocurre en t = 0, ``flujos[i]`` en el
+período i.  Si no hay raíz se devuelve ``nan`` (igual que ``npf.irr``).
+
+``xvpn``/``xtir`` son las variantes con fechas reales (como XNPV/XIRR de
+Excel): cada flujo se descuenta por los días transcurridos desde el primero
+sobre una base de 365 y la tasa es efectiva anual.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import Sequence
+
+import numpy as np
+
+_MAX_ITER_NEWTON = 50
+_MAX_ITER_BISECCION = 200
+_TOLERANCIA = 1e-12
+_DIAS_ANIO = 365.0
+
+
+def vpn(tasa: float, flujos: Sequence[float]) -> float:
+    """Valor presente con el primer flujo en t = 0 (misma convención que ``npf.npv``)."""
+    flujos = np.asarray(flujos, dtype=float)
+    return float(flujos @ (1.0 + tasa) ** -np.arange(flujos.shape[0]))
+
+
+def vpn_vectorizado(tasa: float | np.ndarray, flujos: np.ndarray) -> np.ndarray:
+    """``vpn`` para cada fila de una matriz de flujos; ``tasa`` escalar o por fila."""
+    flujos = np.atleast_2d(np.asarray(flujos, dtype=float))
+    tasa = np.asarray(tasa, dtype=float).reshape(-1, 1)
+    return (flujos * (1.0 + tasa) ** -np.arange(flujos.shape[1])).sum(axis=1)
+
+
+def tir(flujos: Sequence[float], estimado: float = 0.01) -> float:
+    """TIR por período de un vector de flujos.
+
+    ``estimado`` es el punto de arranque de Newton; para un crédito conviene
+    pasar la tasa mensual del préstamo.  El resultado se guarda en caché por
+    contenido, así que calcular la TIR y el CET sobre los mismos flujos
+    solo resuelve una vez.
+    """
+    return _tir_cacheada(tuple(float(f) for f in flujos), float(estimado))
+
+
+def tir_vectorizada(flujos: np.ndarray, estimado: float | np.ndarray = 0.01) -> np.ndarray:
+    """TIR por período para cada fila de una matriz de flujos (columna 0 = t0).
+
+    Newton avanza todas las filas a la vez; las filas que no convergen se
+    resuelven una por una con el método escalar.
+    """
+    flujos = np.atleast_2d(np.asarray(flujos, dtype=float))
+    periodos = np.arange(flujos.shape[1])
+    tasa = np.array(np.broadcast_to(estimado, flujos.shape[:1]), dtype=float)
+    paso = np.full_like(tasa, np.inf)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for _ in range(_MAX_ITER_NEWTON):
+            descuento = (1 + tasa)[:, None] ** -periodos[None, :]
+            valor = (flujos * descuento).sum(axis=1)
+            derivada = -(periodos * flujos * descuento).sum(axis=1) / (1 + tasa)
+            paso = valor / derivada
+            tasa = tasa - paso
+            if np.all(np.abs(paso) < _TOLERANCIA):
+                break
+
+    pendientes = ~((np.abs(paso) < 1e-9) & (tasa > -1))
+    for i in np.flatnonzero(pendientes):
+        tasa[i] = _tir_escalar(flujos[i], float(np.broadcast_to(estimado, tasa.shape)[i]))
+    return tasa
+
+
+def tir_anualidad(monto: float | np.ndarray, pago: float | np.ndarray,
+                  periodos: int | np.ndarray, estimado: float | np.ndarray = 0.01) -> np.ndarray:
+    """TIR por período de ``[monto, -pago, …, -pago]`` sin armar el vector.
+
+    Newton sobre la fórmula cerrada de la anualidad
+    ``monto - pago · (1 - (1 + r)^-n) / r``; acepta arreglos (una TIR por
+    crédito) y devuelve ``nan`` donde no converge.
+    """
+    monto, pago, periodos, tasa = np.broadcast_arrays(
+        np.asarray(monto, dtype=float), np.asarray(pago, dtype=float),
+        np.asarray(periodos, dtype=float), np.asarray(estimado, dtype=float))
+    tasa = tasa.astype(float, copy=True)
+    paso = np.full_like(tasa, np.inf)
+
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for _ in range(_MAX_ITER_NEWTON):
+            descuento = (1 + tasa) ** -periodos
+            anualidad = (1 - descuento) / tasa
+            derivada_anualidad = (periodos * descuento / (1 + tasa) - anualidad) / tasa
+            paso = (monto - pago * anualidad) / (-pago * derivada_anualidad)
+            tasa = tasa - paso
+            if np.all(np.abs(paso) < _TOLERANCIA):
+                break
+
+    return np.where((np.abs(paso) < 1e-9) & (tasa > -1), tasa, np.nan)
+
+
+def xvpn(tasa_anual: float, flujos: Sequence[float], fechas: Sequence) -> float:
+    """Valor presente a la fecha del primer flujo, por días reales (XNPV)."""
+    flujos = np.asarray(flujos, dtype=float)
+    return float(flujos @ (1.0 + tasa_anual) ** -_anios_desde_inicio(fechas))
+
+
+def xtir(flujos: Sequence[float], fechas: Sequence, estimado: float = 0.1) -> float:
+    """Tasa efectiva anual que anula ``xvpn`` (XIRR); ``nan`` si no hay raíz."""
+    return _tir_escalar(np.asarray(flujos, dtype=float), float(estimado),
+                        _anios_desde_inicio(fechas))
+
+
+# =========================
+# Ayudantes privados
+# =========================
+
+@lru_cache(maxsize=256)
+def _tir_cacheada(flujos: tuple, estimado: float) -> float:
+    return _tir_escalar(np.array(flujos), estimado)
+
+
+def _anios_desde_inicio(fechas: Sequence) -> np.ndarray:
+    dias = np.asarray(fechas, dtype="datetime64[D]")
+    return (dias - dias[0]).astype(float) / _DIAS_ANIO
+
+
+def _valor_presente(tasa: float, flujos: np.ndarray, periodos: np.ndarray) -> float:
+    return float(flujos @ (1.0 + tasa) ** -periodos)
+
+
+def _tir_escalar(flujos: np.ndarray, estimado: float,
+                 periodos: np.ndarray | None = None) -> float:
+    """Raíz de ``Σ flujos / (1 + tasa) ** periodos`` (períodos enteros por defecto)."""
+    if periodos is None:
+        periodos = np.arange(flujos.shape[0])
+    if not (np.any(flujos > 0) and np.any(flujos < 0)):
+        return float("nan")
+
+    # --- Newton desde el estimado ---
+    tasa = estimado
+    with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+        for _ in range(_MAX_ITER_NEWTON):
+            descuento = (1 + tasa) ** -periodos
+            valor = flujos @ descuento
+            derivada = -(periodos * flujos) @ descuento / (1 + tasa)
+            if not np.isfinite(derivada) or derivada == 0:
+                break
+            paso = valor / derivada
+            tasa -= paso
+            if tasa <= -1 or not np.isfinite(tasa):
+                break
+            if abs(paso) < _TOLERANCIA:
+                return float(tasa)
+
+    # --- Respaldo: bisección sobre un intervalo con cambio de signo ---
+    intervalo = _encerrar_raiz(flujos, estimado, periodos)
+    if intervalo is None:
+        return float("nan")
+    bajo, alto = intervalo
+    valor_bajo = _valor_presente(bajo, flujos, periodos)
+    for _ in range(_MAX_ITER_BISECCION):
+        medio = (bajo + alto) / 2
+        valor_medio = _valor_presente(medio, flujos, periodos)
+        if valor_medio == 0 or (alto - bajo) / 2 < _TOLERANCIA:
+            return medio
+        if np.sign(valor_medio) == np.sign(valor_bajo):
+            bajo, valor_bajo = medio, valor_medio
+        else:
+            alto = medio
+    return (bajo + alto) / 2
+
+
+def _encerrar_raiz(flujos: np.ndarray, estimado: float, periodos: np.ndarray):
+    """Busca ``(bajo, alto)`` con VPN de signo opuesto alrededor del estimado."""
+    puntos = sorted({-0.9999, -0.999, -0.99, -0.5, -0.1, 0.0, estimado, 0.05, 0.1, 0.5, 1.0, 10.0})
+    valores = [_valor_presente(p, flujos, periodos) for p in puntos]
+    for (bajo, v_bajo), (alto, v_alto) in zip(zip(puntos, valores), zip(puntos[1:], valores[1:])):
+        if np.isfinite(v_bajo) and np.isfinite(v_alto) and np.sign(v_bajo) != np.sign(v_alto):
+            return bajo, alto
+    return None
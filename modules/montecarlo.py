@@ -0,0 +1,204 @@
+# modules/montecarlo.py
+"""Simulación Monte Carlo de créditos a tasa variable (indexados a IBR/UVR).
+
+``generar_tabla_amortizacion`` supone una sola tasa EA para todo el plazo.
+Aquí la tasa EA sigue un proceso con reversión a la media
+(Ornstein-Uhlenbeck discretizado de forma exacta, paso mensual)::
+
+    r[t+1] = media + (r[t] - media)·e^(-velocidad/12) + volatilidad·σ_paso·ε
+
+arrancando en la tasa actual del escenario.  Todas las trayectorias se
+amortizan a la vez (vectores de trayectorias, un paso por mes) y de cada una
+solo se conservan los totales, así que la memoria depende del tamaño del
+bloque y no del número de trayectorias.
+
+Dos formas de absorber los cambios de tasa, igual que los aportes:
+
+* ``"cuota"`` – cada mes se recalcula la cuota sobre el plazo restante;
+  el crédito termina en el plazo pactado.
+* ``"plazo"`` – la cuota inicial queda fija y cambia el número de meses.
+  Si en ``plazo_maximo`` aún hay saldo, se liquida completo ese mes.
+
+Con la misma ``semilla`` y el mismo ``tamano_bloque`` los resultados son
+idénticos entre corridas.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from modules.amortization import normalizar_aportes
+
+# Saldo por debajo del cual el crédito se considera cancelado (un centavo)
+_TOLERANCIA = 0.01
+
+
+def simular_tasas_variables(
+    parametros: dict,
+    n_trayectorias: int = 10_000,
+    volatilidad: float = 0.01,
+    velocidad: float = 0.5,
+    media: Optional[float] = None,
+    modo: str = "cuota",
+    tasa_descuento_anual: Optional[float] = None,
+    semilla: Optional[int] = None,
+    tamano_bloque: int = 5_000,
+    plazo_maximo: Optional[int] = None,
+    tasa_minima: float = 0.0,
+    percentiles: Sequence[float] = (5, 25, 50, 75, 95),
+) -> Dict[str, object]:
+    """Simula ``n_trayectorias`` de tasa y amortiza el crédito en cada una.
+
+    Parámetros
+    ----------
+    parametros : escenario (monto, tasa, plazo, seguro y aportes opcionales)
+    volatilidad : desviación anual de la tasa EA (0.01 = 1 punto)
+    velocidad : velocidad de reversión a la media por año
+    media : tasa EA de largo plazo; por defecto la tasa actual
+    modo : ``"cuota"`` o ``"plazo"`` (ver el docstring del módulo)
+    tasa_descuento_anual : TIO para el VPN; por defecto la tasa actual
+    plazo_maximo : tope de meses en modo ``"plazo"`` (por defecto 2 × plazo)
+    tasa_minima : piso de la tasa EA simulada
+
+    Devuelve un diccionario con:
+        costo_total     : cuotas + seguro + aportes pagados, por trayectoria
+        intereses       : intereses pagados, por trayectoria
+        vpn             : VPN a tasa/12 con el primer flujo en t=0 (como
+                          ``calcular_indicadores``) pero con todos los
+                          aportes como salida, igual que ``optimizar_aportes``
+                          (ver ``flujos_con_aportes``)
+        mes_cancelacion : mes en que el saldo llega a cero
+        liquidadas      : fracción de trayectorias que llegaron a ``plazo_maximo``
+        percentiles     : DataFrame percentil × indicador
+    """
+    if modo not in ("cuota", "plazo"):
+        raise ValueError(f"modo debe ser 'cuota' o 'plazo', no {modo!r}")
+
+    monto = float(parametros["monto"])
+    tasa = float(parametros["tasa"])
+    plazo = int(parametros["plazo"])
+    seguro = float(parametros["seguro"])
+    media = tasa if media is None else media
+    tasa_descuento_anual = tasa if tasa_descuento_anual is None else tasa_descuento_anual
+    plazo_maximo = plazo if modo == "cuota" else (plazo_maximo or 2 * plazo)
+
+    aportes_por_mes: Dict[int, list] = {}
+    for aporte in normalizar_aportes(dict(parametros)):
+        if 1 <= int(aporte["mes"]) <= plazo:
+            aportes_por_mes.setdefault(int(aporte["mes"]), []).append(aporte)
+
+    proceso = {
+        "media": media,
+        "persistencia": np.exp(-velocidad / 12),
+        "choque": volatilidad * np.sqrt(
+            (1 - np.exp(-2 * velocidad / 12)) / (2 * velocidad) if velocidad > 0 else 1 / 12
+        ),
+        "tasa_minima": tasa_minima,
+    }
+
+    tamanos = [min(tamano_bloque, n_trayectorias - i) for i in range(0, n_trayectorias, tamano_bloque)]
+    semillas = np.random.SeedSequence(semilla).spawn(len(tamanos))
+    bloques = [
+        _simular_bloque(np.random.default_rng(s), n, monto, tasa, plazo, plazo_maximo, seguro,
+                        modo, aportes_por_mes, proceso, tasa_descuento_anual / 12)
+        for s, n in zip(semillas, tamanos)
+    ]
+    resultado = {clave: np.concatenate([b[clave] for b in bloques]) for clave in bloques[0]}
+
+    tabla = pd.DataFrame({
+        "Costo Total ($)": np.percentile(resultado["costo_total"], percentiles),
+        "Intereses ($)": np.percentile(resultado["intereses"], percentiles),
+        "VPN ($)": np.percentile(resultado["vpn"], percentiles),
+        "Mes de Cancelación": np.percentile(resultado["mes_cancelacion"], percentiles),
+    }, index=pd.Index([f"P{p:g}" for p in percentiles], name="Percentil")).round(2)
+
+    liquidadas = resultado.pop("liquidada")
+    return {
+        **resultado,
+        "liquidadas": float(liquidadas.mean()),
+        "percentiles": tabla,
+    }
+
+
+# =========================
+# Ayudantes privados
+# =========================
+
+def _simular_bloque(rng: np.random.Generator, n: int, monto: float, tasa: float, plazo: int,
+                    plazo_maximo: int, seguro: float, modo: str, aportes_por_mes: Dict[int, list],
+                    proceso: Dict[str, float], tasa_m_desc: float) -> Dict[str, np.ndarray]:
+    """Amortiza ``n`` trayectorias mes a mes; solo guarda los acumulados."""
+    tasa_ea = np.full(n, tasa)
+    saldo = np.full(n, monto)
+    cuota = np.full(n, _cuota_pmt(monto, (1 + tasa) ** (1/12) - 1, plazo))
+
+    costo = np.zeros(n)
+    intereses = np.zeros(n)
+    vpn = np.full(n, monto)
+    mes_cancelacion = np.full(n, plazo_maximo)
+    liquidada = np.zeros(n, dtype=bool)
+
+    for mes in range(1, plazo_maximo + 1):
+        activo = saldo > _TOLERANCIA
+        if not activo.any() and mes > plazo:
+            break
+
+        tasa_mensual = (1 + tasa_ea) ** (1/12) - 1
+        if modo == "cuota":
+            cuota = np.where(activo, _cuota_pmt(saldo, tasa_mensual, plazo - mes + 1), 0.0)
+
+        interes = np.where(activo, saldo * tasa_mensual, 0.0)
+        pago = np.minimum(cuota, saldo + interes)
+        if mes == plazo_maximo:
+            # Último mes permitido: se liquida lo que quede
+            liquidada = activo & (saldo + interes - pago > _TOLERANCIA)
+            pago = saldo + interes
+        pago = np.where(activo, pago, 0.0)
+        saldo = saldo + interes - pago
+
+        # Aportes del mes (no pueden superar el saldo)
+        abono = np.zeros(n)
+        for aporte in aportes_por_mes.get(mes, ()):
+            monto_aporte = np.minimum(aporte["monto"], saldo)
+            abono += monto_aporte
+            saldo = saldo - monto_aporte
+            if aporte.get("modo", "plazo") == "cuota" and modo == "plazo" and plazo - mes > 0:
+                cuota = _cuota_pmt(saldo, tasa_mensual, plazo - mes)
+
+        # El seguro se cobra durante todo el plazo pactado y mientras haya deuda
+        seguro_mes = seguro if mes <= plazo else np.where(activo, seguro, 0.0)
+        salida = pago + abono + seguro_mes
+
+        costo += salida
+        intereses += interes
+        vpn -= salida / (1 + tasa_m_desc) ** (mes - 1)   # npf.npv: primer flujo en t=0
+
+        cancelada = activo & (saldo <= _TOLERANCIA)
+        mes_cancelacion = np.where(cancelada, mes, mes_cancelacion)
+        saldo = np.where(cancelada, 0.0, saldo)
+
+        # Siguiente tasa del proceso
+        tasa_ea = np.maximum(
+            proceso["media"] + (tasa_ea - proceso["media"]) * proceso["persistencia"]
+            + proceso["choque"] * rng.standard_normal(n),
+            proceso["tasa_minima"],
+        )
+
+    return {
+        "costo_total": costo,
+        "intereses": intereses,
+        "vpn": vpn,
+        "mes_cancelacion": mes_cancelacion,
+        "liquidada": liquidada,
+    }
+
+
+def _cuota_pmt(saldo, tasa_mensual, n):
+    """PMT que acepta escalares o arreglos (tasa 0 → saldo / n)."""
+    tasa_mensual = np.asarray(tasa_mensual, dtype=float)
+    factor = (1 + tasa_mensual) ** n
+    con_tasa = saldo * tasa_mensual * factor / np.where(factor - 1 == 0, 1, factor - 1)
+    return np.where(tasa_mensual > 0, con_tasa, saldo / n)
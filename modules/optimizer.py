@@ -0,0 +1,213 @@
+# modules/optimizer.py
+"""Optimizador de aportes extraordinarios.
+
+Dado un presupuesto total, los meses en que se permite abonar y los modos
+(«plazo» / «cuota»), busca el cronograma de aportes que maximiza el VPN o
+minimiza los intereses totales del crédito.
+
+El presupuesto se reparte en ``unidades`` porciones iguales y la búsqueda es
+por haz (beam search): en cada paso cada cronograma del haz prueba agregar una
+porción más en cada (mes, modo) permitido y solo sobreviven los ``ancho_haz``
+mejores.  Cada candidato difiere de su origen en un solo aporte, así que se
+amortiza con ``AmortizadorIncremental.derivar`` conservando el tramo anterior a
+ese mes; los puntajes de todos los candidatos de un paso se calculan en lote
+sobre una matriz candidatos × meses (sin construir DataFrames).  Se podan:
+
+* cronogramas ya vistos por otro camino,
+* meses posteriores a la cancelación del crédito (el aporte no tendría efecto),
+* porciones mayores que el saldo pendiente en ese mes,
+* candidatos que no mejoran a su cronograma de origen.
+
+Para el VPN todos los aportes cuentan como salida del mes en que se pagan,
+también los de reducción de cuota (que «Flujo ($)» no incluye): de lo
+contrario el optimizador los vería gratis.  Los indicadores del ganador se
+reportan con esa misma base, sobre su cronograma ya redondeado.
+
+Los candidatos se puntúan con el mismo motor que arma la tabla devuelta: el
+francés en pesos usa ``derivar``; otro ``sistema`` o un crédito en UVR se
+amortiza completo con ``generar_cronograma`` por candidato (más lento, pero
+con la misma cuota, saldo e intereses que la tabla).  Los sistemas distintos
+del francés solo admiten aportes «cuota», así que el modo «plazo» se descarta.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from modules.amortization import (AmortizadorIncremental, calcular_columnas, es_uvr,
+                                  generar_cronograma)
+from modules.indicators import flujos_con_aportes, indicadores_desde_flujos
+from modules.irr import vpn_vectorizado
+from modules.systems import SISTEMA_POR_DEFECTO
+
+_OBJETIVOS = ("vpn", "intereses")
+
+
+def optimizar_aportes(
+    parametros: dict,
+    presupuesto: float,
+    meses_permitidos: Iterable[int],
+    modos: Sequence[str] = ("plazo", "cuota"),
+    objetivo: str = "vpn",
+    tasa_descuento_anual: Optional[float] = None,
+    unidades: int = 10,
+    ancho_haz: int = 8,
+) -> Dict:
+    """Busca el mejor cronograma de aportes para ``parametros``.
+
+    Parámetros
+    ----------
+    parametros : escenario base (monto, tasa, plazo, seguro, fecha_inicio y,
+                 si aplica, sistema/denominación); los aportes que traiga se
+                 ignoran.
+    presupuesto : monto total disponible para aportes; no es obligatorio
+                  gastarlo todo.
+    meses_permitidos : meses (1..plazo) en que se puede abonar.
+    modos : modos de aporte a considerar (fuera del francés, solo «cuota»).
+    objetivo : ``"vpn"`` (maximizar) o ``"intereses"`` (minimizar).
+    tasa_descuento_anual : TIO para el VPN; por defecto la tasa del crédito.
+    unidades : porciones en que se divide el presupuesto.
+    ancho_haz : cronogramas que sobreviven en cada paso.
+
+    Devuelve un diccionario con ``aportes``, ``tabla``, ``indicadores``
+    (TIR, VPN y recuperación contando todos los aportes como salida),
+    ``intereses_totales``, ``intereses_sin_aportes`` y ``evaluados``.
+    """
+    if objetivo not in _OBJETIVOS:
+        raise ValueError(f"objetivo debe ser uno de {_OBJETIVOS}, no {objetivo!r}")
+
+    monto = parametros["monto"]
+    tasa_anual = parametros["tasa"]
+    plazo = int(parametros["plazo"])
+    seguro = parametros["seguro"]
+    if tasa_descuento_anual is None:
+        tasa_descuento_anual = tasa_anual
+
+    escenario = {k: v for k, v in parametros.items()
+                 if k not in ("aportes", "mes_aporte", "monto_aporte", "modo_aporte")}
+    frances = (parametros.get("sistema") or SISTEMA_POR_DEFECTO) == SISTEMA_POR_DEFECTO
+    if not frances:
+        modos = [modo for modo in modos if modo == "cuota"]
+        if not modos:
+            raise ValueError(f"El sistema {parametros['sistema']!r} solo admite aportes "
+                             "con reducción de cuota; agregue el modo «cuota».")
+    incremental = frances and not es_uvr(parametros)
+
+    meses = sorted({int(m) for m in meses_permitidos if 1 <= int(m) <= plazo})
+    opciones: List[Tuple[int, str]] = [(m, modo) for m in meses for modo in modos]
+    porcion = presupuesto / unidades if unidades > 0 else 0.0
+
+    def evaluar(candidatos: List[Tuple[int, ...]], origenes: List[tuple]):
+        if incremental:
+            columnas = [
+                AmortizadorIncremental.derivar(cols, _aportes_de(asignacion, opciones, porcion),
+                                               monto, tasa_anual, plazo, seguro,
+                                               _aportes_de(nueva, opciones, porcion))
+                for nueva, (_puntaje, asignacion, cols) in zip(candidatos, origenes)
+            ]
+        else:
+            columnas = [_columnas_cronograma(dict(escenario,
+                                                  aportes=_aportes_de(nueva, opciones, porcion)))
+                        for nueva in candidatos]
+        return _puntajes(columnas, monto, seguro, objetivo, tasa_descuento_anual), columnas
+
+    vacia = (0,) * len(opciones)
+    if incremental:
+        columnas_base = calcular_columnas(monto, tasa_anual, plazo, seguro, [])
+    else:
+        columnas_base = _columnas_cronograma(dict(escenario, aportes=[]))
+    base = (_puntajes([columnas_base], monto, seguro, objetivo, tasa_descuento_anual)[0],
+            vacia, columnas_base)
+    intereses_base = float(columnas_base["interes"].sum())
+
+    haz = [base]
+    mejor = base
+    vistos = {vacia}
+    evaluados = 1
+
+    for _ in range(unidades if opciones and porcion > 0 else 0):
+        candidatos: List[Tuple[int, ...]] = []
+        origenes: List[tuple] = []
+        for origen in haz:
+            _puntaje, asignacion, cols = origen
+            ultimo_mes = int(cols["mes"][cols["activo"]][-1])
+            for j, (mes, _modo) in enumerate(opciones):
+                if mes > ultimo_mes:
+                    break  # opciones ordenadas por mes
+                saldo_previo = monto if mes == 1 else cols["saldo"][mes - 2]
+                if porcion > saldo_previo:
+                    continue
+                nueva = asignacion[:j] + (asignacion[j] + 1,) + asignacion[j + 1:]
+                if nueva in vistos:
+                    continue
+                vistos.add(nueva)
+                candidatos.append(nueva)
+                origenes.append(origen)
+
+        if not candidatos:
+            break
+        puntajes, columnas = evaluar(candidatos, origenes)
+        evaluados += len(candidatos)
+
+        mejoran = np.flatnonzero(puntajes > np.array([o[0] for o in origenes]))
+        if mejoran.size == 0:
+            break
+        orden = mejoran[np.argsort(-puntajes[mejoran], kind="stable")][:ancho_haz]
+        haz = [(puntajes[i], candidatos[i], columnas[i]) for i in orden]
+        if haz[0][0] > mejor[0]:
+            mejor = haz[0]
+
+    aportes = _aportes_de(mejor[1], opciones, porcion)
+    escenario["aportes"] = aportes
+    cronograma = generar_cronograma(escenario)
+    flujos = flujos_con_aportes(cronograma.flujo, cronograma.cuota, cronograma.seguro,
+                                cronograma.aporte, cronograma.aporte_aplicado)
+
+    return {
+        "aportes": aportes,
+        "tabla": cronograma.to_frame(),
+        "indicadores": indicadores_desde_flujos(monto, flujos, tasa_descuento_anual,
+                                                float(cronograma.interes[0]) / monto),
+        "intereses_totales": round(float(mejor[2]["interes"].sum()), 2),
+        "intereses_sin_aportes": round(intereses_base, 2),
+        "evaluados": evaluados,
+    }
+
+
+# =========================
+# Ayudantes privados
+# =========================
+
+def _aportes_de(asignacion: Tuple[int, ...], opciones: List[Tuple[int, str]],
+                porcion: float) -> List[dict]:
+    return [
+        {"mes": mes, "monto": n * porcion, "modo": modo}
+        for n, (mes, modo) in zip(asignacion, opciones) if n
+    ]
+
+
+def _columnas_cronograma(parametros: dict) -> Dict[str, np.ndarray]:
+    """Columnas que usa la búsqueda, tomadas de ``generar_cronograma``."""
+    cronograma = generar_cronograma(parametros)
+    return {nombre: getattr(cronograma, nombre)
+            for nombre in ("mes", "cuota", "interes", "saldo", "flujo", "aporte",
+                           "aporte_aplicado", "activo")}
+
+
+def _puntajes(columnas: List[Dict[str, np.ndarray]], monto: float, seguro: float,
+              objetivo: str, tasa_descuento_anual: float) -> np.ndarray:
+    """Puntaje por candidato (mayor es mejor).
+
+    El VPN sigue la convención de ``calcular_indicadores`` (tasa/12, primer
+    flujo en t=0) pero con todos los aportes como salida.
+    """
+    if objetivo == "intereses":
+        return -np.array([c["interes"].sum() for c in columnas])
+
+    flujos = np.vstack([
+        flujos_con_aportes(c["flujo"], c["cuota"], seguro, c["aporte"], c["aporte_aplicado"])
+        for c in columnas
+    ])
+    return monto + vpn_vectorizado(tasa_descuento_anual / 12, flujos)
@@ -1,9 +1,9 @@
 from fpdf import FPDF
 import os
 
-def generar_pdf_resumen(resumen_aporte: dict, ruta_salida: str) -> str:
+def renderizar_pdf_resumen(resumen_aporte: dict) -> bytes:
+    """Resumen de un escenario como PDF en memoria (sin tocar el disco)."""
     nombre_escenario = resumen_aporte.get("Escenario", "Simulación")
-    nombre_archivo = os.path.join(ruta_salida, f"resumen_{nombre_escenario.replace(' ', '_')}.pdf")
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Arial", 'B', 14)
@@ -13,5 +13,12 @@ def generar_pdf_resumen(resumen_aporte: dict, ruta_salida: str) -> str:
     for clave, valor in resumen_aporte.items():
         pdf.cell(60, 10, str(clave) + ":", 0)
         pdf.cell(100, 10, str(valor), 0, ln=True)
-    pdf.output(nombre_archivo)
+    # FPDF 1.7 devuelve el documento como str latin-1
+    return pdf.output(dest='S').encode('latin-1')
+
+def generar_pdf_resumen(resumen_aporte: dict, ruta_salida: str) -> str:
+    nombre_escenario = resumen_aporte.get("Escenario", "Simulación")
+    nombre_archivo = os.path.join(ruta_salida, f"resumen_{nombre_escenario.replace(' ', '_')}.pdf")
+    with open(nombre_archivo, "wb") as f:
+        f.write(renderizar_pdf_resumen(resumen_aporte))
     return nombre_archivo
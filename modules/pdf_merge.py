@@ -1,9 +1,25 @@
 from fpdf import FPDF
-from PyPDF2 import PdfMerger
+from PyPDF2 import PdfReader, PdfWriter
 from datetime import datetime
+from io import BytesIO
+from typing import Iterable, List, Optional, Tuple, Union
 import os
+import tempfile
 
-def crear_portada(nombre_usuario: str, lista_escenarios: list, archivo_salida: str):
+# Cada documento a fusionar es una ruta o un par (nombre, bytes) ya en memoria
+Documento = Union[str, os.PathLike, Tuple[str, bytes]]
+
+def crear_portada(nombre_usuario: str, lista_escenarios: list, archivo_salida: Optional[str] = None,
+                  paginas: Optional[List[int]] = None) -> bytes:
+    """Portada con la tabla de contenidos.
+
+    ``paginas`` trae la página (1‑based, en el documento final) donde empieza
+    cada escenario; sin ella se asume un escenario por página tras una
+    portada de una página.  Devuelve el PDF en memoria y, si se pasa
+    ``archivo_salida``, también lo escribe ahí.
+    """
+    if paginas is None:
+        paginas = [i + 1 for i in range(1, len(lista_escenarios) + 1)]
     pdf = FPDF()
     pdf.add_page()
     pdf.set_font("Arial", 'B', 16)
@@ -17,20 +33,67 @@ def crear_portada(nombre_usuario: str, lista_escenarios: list, archivo_salida: s
     pdf.set_font("Arial", 'B', 12)
     pdf.cell(0, 10, "Tabla de Contenidos", ln=True)
     pdf.set_font("Arial", '', 12)
-    for i, nombre in enumerate(lista_escenarios, start=1):
-        pdf.cell(0, 8, f"{i}. {nombre} ....................... pág. {i+1}", ln=True)
-    pdf.output(archivo_salida)
+    for i, (nombre, pagina) in enumerate(zip(lista_escenarios, paginas), start=1):
+        pdf.cell(0, 8, f"{i}. {nombre} ....................... pág. {pagina}", ln=True)
+    contenido = pdf.output(dest='S').encode('latin-1')
+    if archivo_salida:
+        with open(archivo_salida, "wb") as f:
+            f.write(contenido)
+    return contenido
 
-def fusionar_pdfs(rutas_pdfs: list, salida: str, nombre_usuario: str = None):
+def fusionar_pdfs(rutas_pdfs: Iterable[Documento], salida: str, nombre_usuario: str = None):
+    """Une los resúmenes en un solo PDF con portada, índice y marcadores.
+
+    ``rutas_pdfs`` puede ser un generador (el lote entrega los PDF ya
+    renderizados en memoria, sin releerlos del disco).  La fusión no es en
+    streaming: todas las páginas se juntan en un ``PdfWriter`` porque la
+    portada, que va primero, se arma al final, cuando ya se conoce cuántas
+    páginas ocupa cada escenario.  No se escriben temporales con nombre
+    fijo: la salida se escribe en un archivo único junto al destino y se
+    renombra, así dos corridas simultáneas no se pisan.
+    """
     if nombre_usuario is None:
         nombre_usuario = input("Ingrese el nombre del responsable del análisis: ")
-    escenarios = [os.path.splitext(os.path.basename(r))[0].replace("resumen_", "").replace("_", " ") for r in rutas_pdfs]
-    portada_temp = "portada_temp.pdf"
-    crear_portada(nombre_usuario, escenarios, portada_temp)
-    merger = PdfMerger()
-    merger.append(portada_temp)
-    for ruta, nombre in zip(rutas_pdfs, escenarios):
-        merger.append(ruta, outline_item=nombre)
-    merger.write(salida)
-    merger.close()
-    os.remove(portada_temp)
+
+    escritor = PdfWriter()
+    escenarios, inicios = [], []
+    for documento in rutas_pdfs:
+        nombre, lector = _abrir(documento)
+        escenarios.append(nombre)
+        inicios.append(len(escritor.pages))
+        for pagina in lector.pages:
+            escritor.add_page(pagina)
+
+    # La portada puede ocupar varias páginas: si no cabe en una, se vuelve a
+    # armar con el índice corrido según su extensión real.
+    paginas = [inicio + 2 for inicio in inicios]
+    portada = PdfReader(BytesIO(crear_portada(nombre_usuario, escenarios, paginas=paginas)))
+    if len(portada.pages) > 1:
+        paginas = [inicio + len(portada.pages) + 1 for inicio in inicios]
+        portada = PdfReader(BytesIO(crear_portada(nombre_usuario, escenarios, paginas=paginas)))
+    for i, pagina in enumerate(portada.pages):
+        escritor.insert_page(pagina, index=i)
+    for nombre, pagina in zip(escenarios, paginas):
+        escritor.add_outline_item(nombre, pagina - 1)
+
+    carpeta = os.path.dirname(os.path.abspath(salida))
+    descriptor, temporal = tempfile.mkstemp(suffix=".pdf", prefix=".fusion_", dir=carpeta)
+    try:
+        with os.fdopen(descriptor, "wb") as f:
+            escritor.write(f)
+        os.replace(temporal, salida)
+    except BaseException:
+        os.remove(temporal)
+        raise
+
+# =========================
+# Ayudantes privados
+# =========================
+
+def _abrir(documento: Documento) -> Tuple[str, PdfReader]:
+    if isinstance(documento, tuple):
+        nombre, contenido = documento
+        return nombre, PdfReader(BytesIO(contenido))
+    ruta = os.fspath(documento)
+    nombre = os.path.splitext(os.path.basename(ruta))[0].replace("resumen_", "").replace("_", " ")
+    return nombre, PdfReader(ruta)
@@ -0,0 +1,188 @@
+# modules/profiling.py
+"""Instrumentación del flujo de simulación: tiempos por etapa y contadores.
+
+Uso típico::
+
+    traza = Traza(perfilador="cprofile")      # o None / "pyinstrument"
+    with traza:
+        with traza.etapa("lectura"):
+            escenarios = leer_escenarios_desde_excel(ruta)
+        traza.contar("escenarios", len(escenarios))
+    traza.guardar("informes/traza.json")
+
+Cada etapa acumula número de llamadas, tiempo total y tiempo máximo, de modo
+que se ve qué paso se dispara con un libro grande.  El perfil opcional cubre
+toda la corrida (bloque ``with`` o ``iniciar``/``finalizar``) y se guarda
+como texto dentro del JSON.  ``pyinstrument`` es opcional: si no está
+instalado se usa ``cProfile`` y se anota en la traza.
+
+Las trazas se pueden serializar entre procesos y combinar con ``fusionar``.
+"""
+
+from __future__ import annotations
+
+import cProfile
+import io
+import json
+import pstats
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+import pandas as pd
+
+_PERFILADORES = ("cprofile", "pyinstrument")
+
+
+class Traza:
+    """Tiempos por etapa, contadores y perfil opcional de una corrida."""
+
+    def __init__(self, perfilador: Optional[str] = None, lineas_perfil: int = 40):
+        if perfilador is not None and perfilador not in _PERFILADORES:
+            raise ValueError(f"perfilador debe ser uno de {_PERFILADORES}, no {perfilador!r}")
+        self.perfilador = perfilador
+        self.lineas_perfil = lineas_perfil
+        self.etapas: Dict[str, Dict[str, float]] = {}
+        self.contadores: Dict[str, int] = {}
+        self.perfil: Optional[str] = None
+        self.notas: list = []
+        self.inicio: Optional[str] = None
+        self.duracion_s: Optional[float] = None
+        self._t0: Optional[float] = None
+        self._activo = None
+
+    # ---------- Corrida completa ----------
+    def iniciar(self) -> "Traza":
+        self.inicio = datetime.now().isoformat(timespec="seconds")
+        self._t0 = time.perf_counter()
+        self._iniciar_perfil()
+        return self
+
+    def finalizar(self) -> None:
+        self._detener_perfil()
+        self.duracion_s = time.perf_counter() - self._t0
+
+    def __enter__(self) -> "Traza":
+        return self.iniciar()
+
+    def __exit__(self, *exc) -> None:
+        self.finalizar()
+
+    # ---------- Etapas y contadores ----------
+    @contextmanager
+    def etapa(self, nombre: str) -> Iterator[None]:
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.registrar(nombre, time.perf_counter() - inicio)
+
+    def registrar(self, nombre: str, segundos: float, llamadas: int = 1) -> None:
+        datos = self.etapas.setdefault(nombre, {"llamadas": 0, "total_s": 0.0, "max_s": 0.0})
+        datos["llamadas"] += llamadas
+        datos["total_s"] += segundos
+        datos["max_s"] = max(datos["max_s"], segundos)
+
+    def contar(self, nombre: str, cantidad: int = 1) -> None:
+        self.contadores[nombre] = self.contadores.get(nombre, 0) + int(cantidad)
+
+    def medir_iterador(self, nombre: str, iterable: Iterable) -> Iterator:
+        """Cuenta como etapa ``nombre`` el tiempo de producir cada elemento.
+
+        Sirve para lectores en streaming, donde la lectura se intercala con
+        el resto del procesamiento.
+        """
+        iterador = iter(iterable)
+        while True:
+            inicio = time.perf_counter()
+            try:
+                elemento = next(iterador)
+            except StopIteration:
+                self.registrar(nombre, time.perf_counter() - inicio, llamadas=0)
+                return
+            self.registrar(nombre, time.perf_counter() - inicio)
+            yield elemento
+
+    def fusionar(self, otra: "Traza") -> None:
+        """Suma etapas y contadores de otra traza (p. ej. de un proceso hijo)."""
+        for nombre, datos in otra.etapas.items():
+            propio = self.etapas.setdefault(nombre, {"llamadas": 0, "total_s": 0.0, "max_s": 0.0})
+            propio["llamadas"] += datos["llamadas"]
+            propio["total_s"] += datos["total_s"]
+            propio["max_s"] = max(propio["max_s"], datos["max_s"])
+        for nombre, cantidad in otra.contadores.items():
+            self.contar(nombre, cantidad)
+
+    # ---------- Resultados ----------
+    def resumen(self) -> Dict:
+        return {
+            "inicio": self.inicio,
+            "duracion_s": self.duracion_s,
+            "etapas": self.etapas,
+            "contadores": self.contadores,
+            "perfilador": self.perfilador,
+            "notas": self.notas,
+            "perfil": self.perfil,
+        }
+
+    def como_dataframe(self) -> pd.DataFrame:
+        """Una fila por etapa, de la más costosa a la menos."""
+        filas = [
+            {
+                "Etapa": nombre,
+                "Llamadas": int(d["llamadas"]),
+                "Total (s)": round(d["total_s"], 4),
+                "Promedio (ms)": round(d["total_s"] / d["llamadas"] * 1e3, 3) if d["llamadas"] else None,
+                "Máximo (ms)": round(d["max_s"] * 1e3, 3),
+            }
+            for nombre, d in self.etapas.items()
+        ]
+        df = pd.DataFrame(filas, columns=["Etapa", "Llamadas", "Total (s)", "Promedio (ms)", "Máximo (ms)"])
+        return df.sort_values("Total (s)", ascending=False, ignore_index=True)
+
+    def guardar(self, ruta: str | Path) -> Path:
+        ruta = Path(ruta)
+        ruta.parent.mkdir(parents=True, exist_ok=True)
+        ruta.write_text(json.dumps(self.resumen(), indent=2, ensure_ascii=False), encoding="utf-8")
+        return ruta
+
+    # =========================
+    # Ayudantes privados
+    # =========================
+
+    def _iniciar_perfil(self) -> None:
+        if self.perfilador == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                self.notas.append("pyinstrument no está instalado; se usó cProfile.")
+                self.perfilador = "cprofile"
+            else:
+                self._activo = Profiler()
+                self._activo.start()
+                return
+        if self.perfilador == "cprofile":
+            self._activo = cProfile.Profile()
+            self._activo.enable()
+
+    def _detener_perfil(self) -> None:
+        if self._activo is None:
+            return
+        if self.perfilador == "pyinstrument":
+            self._activo.stop()
+            self.perfil = self._activo.output_text(unicode=True, color=False)
+        else:
+            self._activo.disable()
+            salida = io.StringIO()
+            pstats.Stats(self._activo, stream=salida).sort_stats("cumulative") \
+                .print_stats(self.lineas_perfil)
+            self.perfil = salida.getvalue()
+        self._activo = None
+
+    def __getstate__(self) -> Dict:
+        # El perfilador activo no se puede serializar entre procesos
+        estado = self.__dict__.copy()
+        estado["_activo"] = None
+        return estado
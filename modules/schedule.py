@@ -0,0 +1,167 @@
+# modules/schedule.py
+"""Cronograma de pagos compacto, respaldado por arreglos NumPy tipados.
+
+La tabla de amortización clásica (DataFrame) mezcla números con ``""`` en
+«Aporte Aplicado», «Aporte ($)» y «Nueva Cuota ($)», lo que obliga a columnas
+``object`` y a ``pd.to_numeric(..., errors="coerce")`` en cada consumidor.
+``Cronograma`` guarda cada columna como ``float64``/``int64``/``bool`` o
+``datetime64[D]``: lo que «no aplica» es ``NaN`` y los sí/no son máscaras.
+
+El DataFrame se construye solo cuando se pide con ``to_frame()`` (y se
+conserva para las siguientes llamadas); ``to_frame(numerico=True)`` lo entrega
+con los mismos tipos del cronograma.
+
+Los créditos en UVR traen además el valor de la UVR de cada fecha y la
+corrección monetaria del saldo; la tabla suma entonces las columnas
+«Corrección Monetaria ($)», «Valor UVR», «Cuota (UVR)» y «Saldo (UVR)».
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+
+class Cronograma:
+    """Columnas de una tabla de amortización, ya redondeadas a centavos."""
+
+    __slots__ = (
+        "mes", "fecha", "cuota", "interes", "amortizacion", "saldo", "flujo",
+        "aporte", "nueva_cuota", "aporte_aplicado", "activo",
+        "seguro", "plazo", "meses_ahorrados", "uvr", "correccion", "_tabla",
+    )
+
+    def __init__(self, mes: np.ndarray, fecha: np.ndarray, cuota: np.ndarray,
+                 interes: np.ndarray, amortizacion: np.ndarray, saldo: np.ndarray,
+                 flujo: np.ndarray, aporte: np.ndarray, nueva_cuota: np.ndarray,
+                 aporte_aplicado: np.ndarray, activo: np.ndarray, seguro: float,
+                 meses_ahorrados: int, uvr: Optional[np.ndarray] = None,
+                 correccion: Optional[np.ndarray] = None):
+        self.mes = mes
+        self.fecha = fecha
+        self.cuota = cuota
+        self.interes = interes
+        self.amortizacion = amortizacion
+        self.saldo = saldo
+        self.flujo = flujo
+        self.aporte = aporte                    # NaN en meses sin aporte (0.0 ya pagado)
+        self.nueva_cuota = nueva_cuota          # NaN si la cuota no se recalculó
+        self.aporte_aplicado = aporte_aplicado
+        self.activo = activo                    # el crédito seguía vivo ese mes
+        self.seguro = seguro
+        self.plazo = int(mes.shape[0])
+        self.meses_ahorrados = meses_ahorrados
+        self.uvr = uvr                          # valor de la UVR por fila; None en pesos
+        self.correccion = correccion
+        self._tabla: Optional[pd.DataFrame] = None
+
+    @classmethod
+    def desde_columnas(cls, columnas: Dict[str, np.ndarray], fechas: np.ndarray,
+                       seguro: float, uvr: Optional[np.ndarray] = None) -> "Cronograma":
+        """Redondea las columnas del motor (``calcular_columnas``).
+
+        ``uvr`` (valor por fila) marca un crédito en UVR; entonces
+        ``columnas`` trae también ``correccion``.
+        """
+        cuota = np.round(columnas["cuota"], 2)
+        saldo = np.round(columnas["saldo"], 2)
+        aplicado = columnas["aporte_aplicado"]
+
+        # En meses ya pagados el aporte se reporta como 0.0
+        aporte = np.where(aplicado, columnas["aporte"], np.nan)
+        aporte[~columnas["activo"] & ~aplicado] = 0.0
+
+        # Meses ahorrados si el crédito termina antes del plazo original: se
+        # cuenta desde el mes de la última cuota (el que deja el saldo en 0)
+        meses_activos = columnas["mes"][columnas["activo"]]
+        plazo = columnas["mes"].shape[0]
+        ahorrados = plazo - int(meses_activos.max()) if meses_activos.size else 0
+
+        return cls(
+            mes=columnas["mes"],
+            fecha=np.asarray(fechas, dtype="datetime64[D]"),
+            cuota=cuota,
+            interes=np.round(columnas["interes"], 2),
+            amortizacion=np.round(columnas["amortizacion"], 2),
+            saldo=saldo,
+            flujo=np.round(columnas["flujo"], 2),
+            aporte=aporte,
+            nueva_cuota=np.where(columnas["cuota_recalculada"], cuota, np.nan),
+            aporte_aplicado=aplicado.copy(),
+            activo=columnas["activo"].copy(),
+            seguro=round(float(seguro), 2),
+            meses_ahorrados=ahorrados,
+            uvr=uvr,
+            correccion=None if uvr is None else np.round(columnas["correccion"], 2),
+        )
+
+    def __len__(self) -> int:
+        return self.plazo
+
+    def __repr__(self) -> str:
+        return (f"Cronograma(plazo={self.plazo}, aportes={int(self.aporte_aplicado.sum())}, "
+                f"meses_ahorrados={self.meses_ahorrados})")
+
+    @property
+    def nbytes(self) -> int:
+        """Memoria ocupada por los arreglos (sin contar el DataFrame en caché)."""
+        return sum(getattr(self, n).nbytes for n in self.__slots__
+                   if isinstance(getattr(self, n), np.ndarray))
+
+    def to_frame(self, numerico: bool = False) -> pd.DataFrame:
+        """Tabla de amortización para mostrar o exportar.
+
+        Por defecto reproduce la tabla de siempre (``""`` donde no aplica,
+        "Sí" en «Aporte Aplicado»); con ``numerico=True`` usa NaN, bool y
+        fechas ``datetime64``.
+        """
+        if numerico:
+            return self._construir(numerico=True)
+        if self._tabla is None:
+            self._tabla = self._construir(numerico=False)
+        return self._tabla
+
+    # =========================
+    # Ayudantes privados
+    # =========================
+
+    def _construir(self, numerico: bool) -> pd.DataFrame:
+        if numerico:
+            fecha = self.fecha
+            aplicado, aporte, nueva_cuota = self.aporte_aplicado, self.aporte, self.nueva_cuota
+        else:
+            fecha = self.fecha.astype(str)
+            aplicado = np.where(self.aporte_aplicado, "Sí", "")
+            aporte = _texto_opcional(self.aporte)
+            nueva_cuota = _texto_opcional(self.nueva_cuota)
+
+        tabla = pd.DataFrame({
+            "Mes": self.mes,
+            "Fecha": fecha,
+            "Cuota ($)": self.cuota,
+            "Interés ($)": self.interes,
+            "Amortización ($)": self.amortizacion,
+            "Saldo ($)": self.saldo,
+            "Seguro ($)": np.full(self.plazo, self.seguro),
+            "Flujo ($)": self.flujo,
+            "Aporte Aplicado": aplicado,
+            "Aporte ($)": aporte,
+            "Nueva Cuota ($)": nueva_cuota,
+            "Meses ahorrados": self.meses_ahorrados,
+        })
+        if self.uvr is not None:
+            tabla["Corrección Monetaria ($)"] = self.correccion
+            tabla["Valor UVR"] = np.round(self.uvr, 4)
+            tabla["Cuota (UVR)"] = np.round(self.cuota / self.uvr, 4)
+            tabla["Saldo (UVR)"] = np.round(self.saldo / self.uvr, 4)
+        return tabla
+
+
+def _texto_opcional(valores: np.ndarray) -> np.ndarray:
+    """Columna object con ``""`` en lugar de NaN (formato de la tabla clásica)."""
+    salida = np.full(valores.shape[0], "", dtype=object)
+    presentes = ~np.isnan(valores)
+    salida[presentes] = valores[presentes].astype(object)
+    return salida
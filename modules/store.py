@@ -0,0 +1,173 @@
+# modules/store.py
+"""Almacén columnar de resultados (Arrow IPC / Feather v2).
+
+En lugar de abrir cientos de libros xlsx, cada tabla de amortización y cada
+diccionario de indicadores se agrega a archivos columnares particionados:
+
+    <carpeta>/amortizacion/part-00000.arrow
+    <carpeta>/indicadores/part-00000.arrow
+
+Ambos llevan la columna ``Escenario`` como clave.  Se usa el formato IPC de
+Arrow (no Parquet) porque se puede leer con ``memory_map`` sin copiar ni
+descomprimir: cargar miles de escenarios cuesta milisegundos.
+
+La exportación a Excel sigue disponible como paso de presentación aparte.
+"""
+
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from modules.schedule import Cronograma
+
+_CARPETA_AMORT = "amortizacion"
+_CARPETA_IND = "indicadores"
+
+# Columnas que la tabla de amortización llena con "" cuando no aplican
+_COLUMNAS_OPCIONALES = ("Aporte ($)", "Nueva Cuota ($)")
+
+# Únicas columnas numéricas que se guardan como enteros; las demás van como
+# float64 para que todas las particiones tengan el mismo esquema
+_COLUMNAS_ENTERAS = ("Mes", "Meses ahorrados")
+
+
+class AlmacenResultados:
+    """Acumula resultados en memoria y los escribe por particiones.
+
+    Uso típico::
+
+        with AlmacenResultados("resultados") as almacen:
+            for esc in escenarios:
+                almacen.agregar(esc["nombre"], df_amort, indicadores)
+
+    Cada ``escenarios_por_particion`` escenarios se escribe un archivo nuevo;
+    al cerrar se vacía lo pendiente.  Las particiones existentes se
+    conservan, de modo que varias corridas se van agregando.
+    """
+
+    def __init__(self, carpeta: str | Path, escenarios_por_particion: int = 256):
+        self.carpeta = Path(carpeta)
+        self.escenarios_por_particion = escenarios_por_particion
+        for sub in (_CARPETA_AMORT, _CARPETA_IND):
+            (self.carpeta / sub).mkdir(parents=True, exist_ok=True)
+
+        self._tablas: List[pd.DataFrame] = []
+        self._indicadores: List[Dict] = []
+        self._siguiente = len(list((self.carpeta / _CARPETA_IND).glob("part-*.arrow")))
+
+    def agregar(self, nombre_escenario: str, df_amort: pd.DataFrame | Cronograma,
+                indicadores: Dict[str, float | int | None]) -> None:
+        tabla = _normalizar_tabla(df_amort)
+        tabla.insert(0, "Escenario", nombre_escenario)
+        self._tablas.append(tabla)
+        self._indicadores.append({"Escenario": nombre_escenario, **indicadores})
+
+        if len(self._indicadores) >= self.escenarios_por_particion:
+            self.vaciar()
+
+    def vaciar(self) -> None:
+        """Escribe lo acumulado como una partición nueva."""
+        if not self._indicadores:
+            return
+        nombre = f"part-{self._siguiente:05d}.arrow"
+        _escribir_ipc(pd.concat(self._tablas, ignore_index=True),
+                      self.carpeta / _CARPETA_AMORT / nombre)
+        _escribir_ipc(pd.DataFrame(self._indicadores),
+                      self.carpeta / _CARPETA_IND / nombre)
+        self._siguiente += 1
+        self._tablas.clear()
+        self._indicadores.clear()
+
+    def cerrar(self) -> None:
+        self.vaciar()
+
+    def __enter__(self) -> "AlmacenResultados":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.cerrar()
+
+
+def cargar_resultados(
+    carpeta: str | Path,
+    escenarios: Optional[Iterable[str]] = None,
+    como_arrow: bool = False,
+) -> Tuple[pd.DataFrame, pd.DataFrame] | Tuple[pa.Table, pa.Table]:
+    """Devuelve ``(amortizacion, indicadores)`` leyendo todas las particiones.
+
+    Los archivos se abren con ``memory_map``; con ``como_arrow=True`` se
+    devuelven las ``pyarrow.Table`` sin copiar los datos.  ``escenarios``
+    filtra por la columna ``Escenario``.
+    """
+    carpeta = Path(carpeta)
+    filtro = None if escenarios is None else pa.array(list(escenarios), type=pa.string())
+    amort = _leer_particiones(carpeta / _CARPETA_AMORT, filtro)
+    ind = _leer_particiones(carpeta / _CARPETA_IND, filtro)
+    if como_arrow:
+        return amort, ind
+    return amort.to_pandas(), ind.to_pandas()
+
+
+# =========================
+# Ayudantes privados
+# =========================
+
+def _normalizar_tabla(df_amort: pd.DataFrame | Cronograma) -> pd.DataFrame:
+    """Pasa las columnas mixtas ("" / número) a float con NaN para Arrow."""
+    if isinstance(df_amort, Cronograma):
+        tabla = df_amort.to_frame(numerico=True)
+        tabla["Fecha"] = tabla["Fecha"].astype(str)
+        tabla["Aporte Aplicado"] = np.where(tabla["Aporte Aplicado"], "Sí", "")
+        return tabla
+    tabla = df_amort.copy()
+    for col in _COLUMNAS_OPCIONALES:
+        if col in tabla.columns:
+            tabla[col] = pd.to_numeric(tabla[col], errors="coerce")
+    return tabla
+
+
+def _escribir_ipc(df: pd.DataFrame, ruta: Path) -> None:
+    # Se escribe a un temporal y se renombra: una corrida interrumpida no
+    # deja particiones a medio escribir.
+    tabla = _esquema_fijo(pa.Table.from_pandas(df, preserve_index=False))
+    temporal = ruta.with_suffix(".tmp")
+    with pa.OSFile(str(temporal), "wb") as destino:
+        with pa.ipc.new_file(destino, tabla.schema) as escritor:
+            escritor.write_table(tabla)
+    os.replace(temporal, ruta)
+
+
+def _esquema_fijo(tabla: pa.Table) -> pa.Table:
+    """Enteros (salvo ``_COLUMNAS_ENTERAS``) y columnas todo-nulas a float64.
+
+    Un indicador o una columna de dinero puede salir entero en una partición
+    y decimal en otra (o vacío, tipo ``null``); sin esto las particiones no
+    se pueden concatenar.
+    """
+    campos = [
+        campo.with_type(pa.float64())
+        if (pa.types.is_integer(campo.type) and campo.name not in _COLUMNAS_ENTERAS)
+        or pa.types.is_null(campo.type) else campo
+        for campo in tabla.schema
+    ]
+    return tabla.cast(pa.schema(campos, metadata=tabla.schema.metadata))
+
+
+def _leer_particiones(carpeta: Path, filtro: Optional[pa.Array]) -> pa.Table:
+    tablas = []
+    for ruta in sorted(carpeta.glob("part-*.arrow")):
+        tabla = pa.ipc.open_file(pa.memory_map(str(ruta), "r")).read_all()
+        if filtro is not None:
+            tabla = tabla.filter(pc.is_in(tabla["Escenario"], value_set=filtro))
+        tablas.append(tabla)
+    if not tablas:
+        return pa.table({"Escenario": pa.array([], type=pa.string())})
+    # "permissive" une int64/float64 de particiones escritas antes del esquema fijo
+    return pa.concat_tables(tablas, promote_options="permissive")
@@ -0,0 +1,238 @@
+# modules/sweep.py
+"""Barridos de sensibilidad sobre una malla de parámetros.
+
+Se parte de un escenario base y de uno o más ejes, por ejemplo::
+
+    ejes = {
+        "tasa": np.linspace(0.08, 0.16, 50),
+        "plazo": range(60, 361, 6),
+        "monto_aporte": np.linspace(0, 50e6, 20),
+    }
+
+Cada celda de la malla (producto cartesiano de los ejes) es un escenario.  Las
+celdas se procesan por bloques.  Las celdas sin aportes se amortizan todas
+juntas con el núcleo vectorizado del ``sistema`` del escenario base
+(``modules.systems``); solo las que tienen aportes, o un crédito en UVR,
+pasan una a una por el motor por tramos.  Luego se calculan TIR, VPN, CET y
+los periodos de recuperación para todo el bloque a la vez sobre una matriz
+celdas × meses.  Los bloques se
+reparten entre procesos y se entregan en orden, de modo que el resultado se
+puede ir escribiendo a un archivo Arrow sin tenerlo completo en memoria.
+
+Ejes admitidos: monto, tasa, plazo, seguro, mes_aporte, monto_aporte,
+modo_aporte y tasa_descuento.  Los tres ``*_aporte`` describen un aporte
+adicional a los que ya traiga el escenario base; fuera del francés el modo
+por defecto es «cuota».  ``sistema``, ``crecimiento`` y ``denominacion`` se
+toman del escenario base.
+"""
+
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from functools import partial
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from modules.amortization import (calcular_columnas_sistema, es_uvr, generar_cronograma,
+                                  normalizar_aportes, opciones_sistema)
+from modules.irr import tir_vectorizada, vpn_vectorizado
+from modules.systems import SISTEMA_POR_DEFECTO, amortizar
+
+EJES = ("monto", "tasa", "plazo", "seguro",
+        "mes_aporte", "monto_aporte", "modo_aporte", "tasa_descuento")
+
+
+def iterar_barrido(
+    base: dict,
+    ejes: Dict[str, Sequence],
+    tasa_descuento_anual: Optional[float] = None,
+    tamano_bloque: int = 2048,
+    workers: int = 1,
+) -> Iterator[pd.DataFrame]:
+    """Genera un DataFrame por bloque de celdas, en el orden de la malla.
+
+    Cada fila trae los valores de los ejes y las columnas Cuota ($),
+    Intereses ($), TIR (%), VPN ($), CET (%), Periodo de Recuperación (meses)
+    y Payback Descontado (meses), con las definiciones del ``indicators.py``
+    de la raíz.  Sin eje ``tasa_descuento`` se descuenta con
+    ``tasa_descuento_anual`` o, si se omite, con la tasa de cada crédito.
+    ``workers=0`` usa todos los núcleos.
+    """
+    desconocidos = set(ejes) - set(EJES)
+    if desconocidos:
+        raise ValueError(f"Ejes no soportados: {sorted(desconocidos)}")
+
+    nombres = list(ejes)
+    valores = [list(ejes[n]) for n in nombres]
+    forma = tuple(len(v) for v in valores)
+    total = int(np.prod(forma)) if forma else 1
+
+    evaluar = partial(_evaluar_bloque, dict(base), nombres, valores, forma,
+                      tasa_descuento_anual)
+    bloques = [(i, min(i + tamano_bloque, total)) for i in range(0, total, tamano_bloque)]
+
+    workers = workers or os.cpu_count() or 1
+    with ExitStack() as pila:
+        if workers > 1 and len(bloques) > 1:
+            pool = pila.enter_context(ProcessPoolExecutor(max_workers=workers))
+            resultados = pool.map(evaluar, bloques)
+        else:
+            resultados = map(evaluar, bloques)
+        yield from resultados
+
+
+def barrido(base: dict, ejes: Dict[str, Sequence], **opciones) -> pd.DataFrame:
+    """Evalúa toda la malla y devuelve una fila por celda."""
+    return pd.concat(list(iterar_barrido(base, ejes, **opciones)), ignore_index=True)
+
+
+def barrido_a_archivo(ruta: str | Path, base: dict, ejes: Dict[str, Sequence],
+                      **opciones) -> Path:
+    """Evalúa la malla escribiendo cada bloque a un archivo Arrow IPC.
+
+    Solo hay un bloque en memoria a la vez.  El archivo se escribe a un
+    temporal y se renombra al terminar.
+    """
+    ruta = Path(ruta)
+    ruta.parent.mkdir(parents=True, exist_ok=True)
+    temporal = ruta.with_suffix(".tmp")
+
+    escritor = None
+    with pa.OSFile(str(temporal), "wb") as destino:
+        try:
+            for df in iterar_barrido(base, ejes, **opciones):
+                lote = pa.RecordBatch.from_pandas(df, preserve_index=False)
+                if escritor is None:
+                    escritor = pa.ipc.new_file(destino, lote.schema)
+                escritor.write_batch(lote)
+        finally:
+            if escritor is not None:
+                escritor.close()
+    os.replace(temporal, ruta)
+    return ruta
+
+
+def cargar_barrido(ruta: str | Path) -> pd.DataFrame:
+    """Lee un barrido escrito con ``barrido_a_archivo`` (vía ``memory_map``)."""
+    return pa.ipc.open_file(pa.memory_map(str(ruta), "r")).read_all().to_pandas()
+
+
+# =========================
+# Ayudantes privados
+# =========================
+
+def _evaluar_bloque(base: dict, nombres: List[str], valores: List[list],
+                    forma: Tuple[int, ...], tasa_descuento_anual: Optional[float],
+                    rango: Tuple[int, int]) -> pd.DataFrame:
+    inicio, fin = rango
+    indices = np.unravel_index(np.arange(inicio, fin), forma) if forma else ()
+    celdas = {n: [valores[k][i] for i in idx] for k, (n, idx) in enumerate(zip(nombres, indices))}
+    n_celdas = fin - inicio
+
+    def columna(nombre, defecto):
+        return celdas.get(nombre, [defecto] * n_celdas)
+
+    montos = np.asarray(columna("monto", base.get("monto")), dtype=float)
+    tasas = np.asarray(columna("tasa", base.get("tasa")), dtype=float)
+    plazos = np.asarray(columna("plazo", base.get("plazo")), dtype=int)
+    seguros = np.asarray(columna("seguro", base.get("seguro")), dtype=float)
+    meses_aporte = columna("mes_aporte", base.get("mes_aporte", 1))
+    montos_aporte = columna("monto_aporte", 0)
+    sistema = base.get("sistema") or SISTEMA_POR_DEFECTO
+    modos_aporte = columna("modo_aporte", "plazo" if sistema == SISTEMA_POR_DEFECTO else "cuota")
+    aportes_base = normalizar_aportes(dict(base))
+    opciones = opciones_sistema(base)
+
+    # --- Matriz celdas × meses (ceros después del plazo) ---
+    max_plazo = int(plazos.max(initial=0))
+    flujos = np.zeros((n_celdas, max_plazo))
+    cuota_mes_1 = np.zeros(n_celdas)
+    interes_mes_1 = np.zeros(n_celdas)
+    intereses = np.zeros(n_celdas)
+
+    # Celdas sin aportes (en pesos): un solo llamado al núcleo del sistema
+    con_aportes = np.array([bool(aportes_base) or bool(m) for m in montos_aporte], dtype=bool)
+    lisas = np.flatnonzero(~con_aportes) if not es_uvr(base) else np.array([], dtype=int)
+    if lisas.size:
+        meses = np.arange(1, max_plazo + 1)
+        nucleo = amortizar(sistema, montos[lisas], (1 + tasas[lisas]) ** (1/12) - 1,
+                           plazos[lisas], meses, **opciones)
+        activo = meses[None, :] <= plazos[lisas, None]
+        flujos[lisas] = np.where(activo, -(nucleo["cuota"] + seguros[lisas, None]), 0.0)
+        cuota_mes_1[lisas] = nucleo["cuota"][:, 0]
+        interes_mes_1[lisas] = nucleo["interes"][:, 0]
+        intereses[lisas] = nucleo["interes"].sum(axis=1)
+
+    # Celdas con aportes (o en UVR): motor por tramos, una a la vez
+    for j in np.setdiff1d(np.arange(n_celdas), lisas):
+        aportes = list(aportes_base)
+        if montos_aporte[j]:
+            aportes.append({"mes": int(meses_aporte[j]), "monto": float(montos_aporte[j]),
+                            "modo": modos_aporte[j]})
+            aportes.sort(key=lambda a: a["mes"])
+        c = _columnas_celda(base, sistema, opciones, montos[j], tasas[j], plazos[j],
+                            seguros[j], aportes)
+        flujos[j, :plazos[j]] = c["flujo"]
+        cuota_mes_1[j] = c["cuota"][0]
+        interes_mes_1[j] = c["interes"][0]
+        intereses[j] = c["interes"].sum()
+    monto_inicial = montos
+
+    if "tasa_descuento" in celdas:
+        tasa_desc = np.asarray(celdas["tasa_descuento"], dtype=float)
+    elif tasa_descuento_anual is not None:
+        tasa_desc = np.full(n_celdas, float(tasa_descuento_anual))
+    else:
+        tasa_desc = tasas
+    tasa_m_desc = tasa_desc / 12
+
+    # --- TIR / CET ---
+    estimado = np.divide(interes_mes_1, monto_inicial,
+                         out=np.full(n_celdas, 0.01), where=monto_inicial != 0)
+    tir_m = tir_vectorizada(np.column_stack([monto_inicial, flujos]), estimado)
+    tir_a = np.round(((1 + tir_m) ** 12 - 1) * 100, 2)
+
+    # --- VPN: npf.npv descuenta el primer flujo mensual en t=0 ---
+    vpn = vpn_vectorizado(tasa_m_desc, flujos) + monto_inicial
+
+    # --- Recuperación simple y descontada ---
+    periodos = np.arange(1, max_plazo + 1)
+    recuperacion = _primer_mes(np.cumsum(flujos, axis=1) >= 0)
+    descontados = flujos * (1 + tasa_m_desc)[:, None] ** -periodos[None, :]
+    payback = _primer_mes(monto_inicial[:, None] + np.cumsum(descontados, axis=1) >= 0)
+
+    resultado = pd.DataFrame(celdas)
+    resultado["Cuota ($)"] = np.round(cuota_mes_1, 2)
+    resultado["Intereses ($)"] = np.round(intereses, 2)
+    resultado["TIR (%)"] = tir_a
+    resultado["VPN ($)"] = np.round(vpn, 2)
+    resultado["CET (%)"] = tir_a
+    resultado["Periodo de Recuperación (meses)"] = recuperacion
+    resultado["Payback Descontado (meses)"] = payback
+    return resultado
+
+
+def _columnas_celda(base: dict, sistema: str, opciones: dict, monto: float, tasa: float,
+                    plazo: int, seguro: float, aportes: List[dict]) -> Dict[str, np.ndarray]:
+    """Cuota, interés y flujo de una celda con aportes (o de un crédito en UVR)."""
+    if es_uvr(base):
+        cronograma = generar_cronograma(dict(base, monto=float(monto), tasa=float(tasa),
+                                             plazo=int(plazo), seguro=float(seguro),
+                                             aportes=aportes))
+        return {"cuota": cronograma.cuota, "interes": cronograma.interes,
+                "flujo": cronograma.flujo}
+    return calcular_columnas_sistema(sistema, float(monto), float(tasa), int(plazo),
+                                     float(seguro), aportes, **opciones)
+
+
+def _primer_mes(alcanzado: np.ndarray) -> pd.arrays.IntegerArray:
+    """Primer mes (1-based) en que la condición se cumple; NA si nunca."""
+    meses = pd.array(alcanzado.argmax(axis=1) + 1, dtype="Int64")
+    meses[~alcanzado.any(axis=1)] = pd.NA
+    return meses
@@ -0,0 +1,138 @@
+# modules/systems.py
+"""Sistemas de amortización como núcleos vectorizados intercambiables.
+
+Cada sistema se registra en ``SISTEMAS`` con una función núcleo de firma
+común::
+
+    nucleo(saldos, tasas_mensuales, plazos, meses, **opciones) -> {
+        "cuota", "interes", "amortizacion", "saldo"   # matrices N × M
+    }
+
+``saldos``, ``tasas_mensuales`` y ``plazos`` son arreglos de N créditos y
+``meses`` es ``1..M``.  Todo se resuelve con fórmulas cerradas y
+*broadcasting*: comparar sistemas sobre una cartera cuesta una pasada de
+arreglos por sistema.  Los meses posteriores al plazo quedan en cero.
+
+Sistemas incluidos:
+
+* ``frances``          – cuota fija (PMT), el de siempre.
+* ``abono_constante``  – la misma amortización a capital cada mes; la cuota
+  baja con los intereses.
+* ``gradual``          – cuota que crece a una tasa anual ``crecimiento``
+  (anualidad creciente); puede tener amortización negativa al comienzo.
+* ``solo_intereses``   – solo intereses cada mes y el capital completo en la
+  última cuota (bullet / pago global).
+
+Para agregar uno basta decorar el núcleo con ``@registrar_sistema("nombre")``.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict
+
+import numpy as np
+
+Nucleo = Callable[..., Dict[str, np.ndarray]]
+
+SISTEMAS: Dict[str, Nucleo] = {}
+SISTEMA_POR_DEFECTO = "frances"
+
+
+def registrar_sistema(nombre: str) -> Callable[[Nucleo], Nucleo]:
+    """Decorador que agrega un núcleo al registro."""
+    def decorador(nucleo: Nucleo) -> Nucleo:
+        SISTEMAS[nombre] = nucleo
+        return nucleo
+    return decorador
+
+
+def obtener_sistema(nombre: str | None) -> Nucleo:
+    nombre = nombre or SISTEMA_POR_DEFECTO
+    try:
+        return SISTEMAS[nombre]
+    except KeyError:
+        raise ValueError(f"sistema debe ser uno de {tuple(SISTEMAS)}, no {nombre!r}") from None
+
+
+def amortizar(sistema: str | None, saldos, tasas_mensuales, plazos, meses=None,
+              **opciones) -> Dict[str, np.ndarray]:
+    """Aplica el núcleo de ``sistema`` a N créditos y recorta tras cada plazo."""
+    saldos = np.atleast_1d(np.asarray(saldos, dtype=float))
+    tasas_mensuales = np.broadcast_to(np.asarray(tasas_mensuales, dtype=float), saldos.shape)
+    plazos = np.broadcast_to(np.asarray(plazos, dtype=int), saldos.shape)
+    if meses is None:
+        meses = np.arange(1, int(plazos.max(initial=0)) + 1)
+
+    columnas = obtener_sistema(sistema)(saldos, tasas_mensuales, plazos, meses, **opciones)
+    activo = meses[None, :] <= plazos[:, None]
+    for nombre, valores in columnas.items():
+        columnas[nombre] = np.where(activo, valores, 0.0)
+    columnas["saldo"] = np.maximum(columnas["saldo"], 0.0)
+    return columnas
+
+
+# =========================
+# Núcleos
+# =========================
+
+@registrar_sistema("frances")
+def _frances(saldos, tasas, plazos, meses):
+    crecimiento = (1 + tasas) ** plazos
+    cuotas = saldos * tasas * crecimiento / (crecimiento - 1)
+    factor = (1 + tasas)[:, None] ** meses[None, :]
+    saldo = saldos[:, None] * factor - (cuotas / tasas)[:, None] * (factor - 1)
+    return _desde_saldos(saldos, tasas, saldo, np.broadcast_to(cuotas[:, None], saldo.shape))
+
+
+@registrar_sistema("abono_constante")
+def _abono_constante(saldos, tasas, plazos, meses):
+    abono = saldos / plazos
+    saldo = saldos[:, None] - abono[:, None] * meses[None, :]
+    previo = saldo + abono[:, None]
+    interes = previo * tasas[:, None]
+    amortizacion = np.broadcast_to(abono[:, None], saldo.shape)
+    return {"cuota": interes + amortizacion, "interes": interes,
+            "amortizacion": amortizacion, "saldo": saldo}
+
+
+@registrar_sistema("gradual")
+def _gradual(saldos, tasas, plazos, meses, crecimiento: float = 0.05):
+    # Anualidad creciente: cuota_k = c1 · (1 + g)^(k-1), con g mensual
+    g = (1 + np.asarray(crecimiento, dtype=float)) ** (1 / 12) - 1
+    g = np.broadcast_to(g, saldos.shape)
+    razon = (1 + g) / (1 + tasas)
+    iguales = np.isclose(tasas, g)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        primera = np.where(iguales, saldos * (1 + tasas) / plazos,
+                           saldos * (tasas - g) / (1 - razon ** plazos))
+        factor_i = (1 + tasas)[:, None] ** meses[None, :]
+        factor_g = (1 + g)[:, None] ** meses[None, :]
+        acumulado = np.where(iguales[:, None],
+                             meses[None, :] * (1 + tasas)[:, None] ** (meses[None, :] - 1),
+                             (factor_i - factor_g) / (tasas - g)[:, None])
+    saldo = saldos[:, None] * factor_i - primera[:, None] * acumulado
+    cuota = primera[:, None] * factor_g / (1 + g)[:, None]
+    return _desde_saldos(saldos, tasas, saldo, cuota)
+
+
+@registrar_sistema("solo_intereses")
+def _solo_intereses(saldos, tasas, plazos, meses):
+    forma = (saldos.shape[0], meses.shape[0])
+    ultimo = meses[None, :] == plazos[:, None]
+    interes = np.broadcast_to((saldos * tasas)[:, None], forma)
+    amortizacion = np.where(ultimo, saldos[:, None], 0.0)
+    saldo = np.where(meses[None, :] >= plazos[:, None], 0.0, saldos[:, None])
+    return {"cuota": interes + amortizacion, "interes": interes,
+            "amortizacion": amortizacion, "saldo": saldo}
+
+
+# =========================
+# Ayudantes privados
+# =========================
+
+def _desde_saldos(saldos, tasas, saldo, cuota) -> Dict[str, np.ndarray]:
+    """Interés y amortización a partir de la trayectoria del saldo."""
+    previo = np.concatenate((saldos[:, None], saldo[:, :-1]), axis=1)
+    interes = previo * tasas[:, None]
+    return {"cuota": np.asarray(cuota, dtype=float), "interes": interes,
+            "amortizacion": cuota - interes, "saldo": saldo}
@@ -0,0 +1,177 @@
+# modules/totals.py
+"""Totales e indicadores de un crédito sin construir la tabla de amortización.
+
+Sin aportes anticipados el sistema de cuota fija tiene forma cerrada: la
+cuota es la PMT, el saldo tras k pagos es conocido y las sumas de cada
+columna salen de la cuota y el monto.  ``totales_sin_aportes`` calcula así
+los totales y los indicadores con un número fijo de operaciones por columna,
+sin materializar filas; acepta escalares o arreglos (una cartera entera en
+una llamada).
+
+Con aportes, UVR u otro sistema no hay forma cerrada, pero tampoco hace falta
+la tabla: ``totales_cronograma`` suma directamente los arreglos del motor
+(``Cronograma``) y calcula los indicadores desde el arreglo de flujos.
+``totales_escenario`` elige el camino según el escenario y
+``totales_cartera`` resuelve una lista de escenarios agrupando en una sola
+llamada vectorizada todos los que admiten la forma cerrada.
+
+Las sumas son exactas, sin el redondeo a centavos que lleva cada fila de la
+tabla: difieren de la suma de la tabla en a lo sumo medio centavo por fila.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from modules.amortization import es_uvr, generar_cronograma, normalizar_aportes
+from modules.indicators import indicadores_desde_flujos
+from modules.irr import tir_anualidad
+from modules.schedule import Cronograma
+from modules.systems import SISTEMA_POR_DEFECTO
+
+
+def totales_sin_aportes(
+    monto: float | np.ndarray,
+    tasa_anual: float | np.ndarray,
+    plazo: int | np.ndarray,
+    seguro: float | np.ndarray,
+    tasa_descuento_anual: float | np.ndarray | None = None,
+) -> Dict[str, float | np.ndarray | None]:
+    """Totales e indicadores de un crédito francés sin aportes.
+
+    Devuelve las claves de la fila «Totales Generales» (Cuota, Interés,
+    Amortización, Seguro y Flujo) más «Meses ahorrados» y las de
+    ``calcular_indicadores`` (TIR, VPN con la convención de ``npf.npv`` y
+    Periodo de Recuperación).  Si se omite ``tasa_descuento_anual`` se usa
+    la tasa del crédito.
+    """
+    escalar = all(np.ndim(x) == 0 for x in (monto, tasa_anual, plazo, seguro))
+    if tasa_descuento_anual is None:
+        tasa_descuento_anual = tasa_anual
+    monto, tasa_anual, plazo, seguro, tasa_descuento_anual = (
+        np.asarray(x, dtype=float)
+        for x in np.broadcast_arrays(monto, tasa_anual, plazo, seguro, tasa_descuento_anual))
+
+    tasa_mensual = (1 + tasa_anual) ** (1/12) - 1
+    crecimiento = (1 + tasa_mensual) ** plazo
+    cuota = monto * tasa_mensual * crecimiento / (crecimiento - 1)
+    pago = cuota + seguro
+
+    total_cuotas = cuota * plazo
+    total_seguro = seguro * plazo
+
+    # TIR: raíz de monto = pago · a(n, r), sin armar el vector de flujos
+    tir_m = tir_anualidad(monto, pago, plazo, estimado=tasa_mensual)
+    tir_a = (1 + tir_m) ** 12 - 1
+
+    # VPN: npf.npv descuenta el primer flujo mensual en t=0 →
+    # Σ_{k=0}^{n-1} (1+d)^-k = (1+d)·(1 - (1+d)^-n) / d
+    d = tasa_descuento_anual / 12
+    with np.errstate(divide="ignore", invalid="ignore"):
+        factor = np.where(d == 0, plazo, (1 + d) * (1 - (1 + d) ** -plazo) / d)
+    valor_presente = monto - pago * factor
+
+    totales = {
+        "Cuota ($)": total_cuotas,
+        "Interés ($)": total_cuotas - monto,
+        "Amortización ($)": monto,
+        "Seguro ($)": total_seguro,
+        "Flujo ($)": -(total_cuotas + total_seguro),
+        "Meses ahorrados": np.zeros_like(monto, dtype=int),
+        "TIR (%)": np.round(tir_a * 100, 2),
+        "VPN ($)": np.round(valor_presente, 2),
+    }
+    if escalar:
+        totales = {k: v.item() for k, v in totales.items()}
+        totales["TIR (%)"] = None if np.isnan(totales["TIR (%)"]) else totales["TIR (%)"]
+    # Los flujos mensuales son todos negativos: el acumulado nunca llega a 0
+    totales["Periodo de Recuperación (meses)"] = None
+    return totales
+
+
+def totales_cronograma(cronograma: Cronograma,
+                       tasa_descuento_anual: float) -> Dict[str, Optional[float]]:
+    """Las mismas claves de ``totales_sin_aportes`` a partir de un ``Cronograma``.
+
+    Suma los arreglos ya redondeados, así que coincide con sumar las columnas
+    de ``cronograma.to_frame()`` y con ``calcular_indicadores`` sobre esa
+    tabla, pero sin construirla.
+    """
+    monto = float(cronograma.saldo[0] + cronograma.amortizacion[0])
+    if cronograma.correccion is not None:
+        monto -= float(cronograma.correccion[0])
+    tasa_mensual = float(cronograma.interes[0]) / monto if monto else 0.01
+
+    totales = {
+        "Cuota ($)": float(cronograma.cuota.sum()),
+        "Interés ($)": float(cronograma.interes.sum()),
+        "Amortización ($)": float(cronograma.amortizacion.sum()),
+        "Seguro ($)": cronograma.seguro * cronograma.plazo,
+        "Flujo ($)": float(cronograma.flujo.sum()),
+        "Meses ahorrados": cronograma.meses_ahorrados,
+    }
+    totales.update(indicadores_desde_flujos(monto, cronograma.flujo,
+                                            tasa_descuento_anual, tasa_mensual))
+    return totales
+
+
+def totales_escenario(parametros: dict,
+                      tasa_descuento_anual: Optional[float] = None) -> Dict[str, Optional[float]]:
+    """Totales e indicadores de un escenario sin armar la tabla.
+
+    Usa la forma cerrada si el escenario la admite (ver ``_forma_cerrada``) y,
+    si no, los arreglos de ``generar_cronograma``.  Sin
+    ``tasa_descuento_anual`` se descuenta a la tasa del crédito.
+    """
+    if tasa_descuento_anual is None:
+        tasa_descuento_anual = parametros["tasa"]
+    if _forma_cerrada(parametros):
+        return totales_sin_aportes(parametros["monto"], parametros["tasa"], parametros["plazo"],
+                                   parametros["seguro"], tasa_descuento_anual)
+    return totales_cronograma(generar_cronograma(dict(parametros)), tasa_descuento_anual)
+
+
+def totales_cartera(escenarios: Iterable[dict],
+                    tasa_descuento_anual: Optional[float] = None) -> pd.DataFrame:
+    """Una fila de totales e indicadores por escenario, en el orden recibido.
+
+    Los escenarios con forma cerrada se resuelven juntos en una llamada de
+    arreglos; los demás, uno por uno con el motor.  El índice es el nombre.
+    """
+    escenarios = list(escenarios)
+    filas: list = [None] * len(escenarios)
+
+    cerrados = [i for i, esc in enumerate(escenarios) if _forma_cerrada(esc)]
+    if cerrados:
+        def columna(clave):
+            return np.array([escenarios[i][clave] for i in cerrados], dtype=float)
+
+        tasas = columna("tasa")
+        vector = totales_sin_aportes(columna("monto"), tasas, columna("plazo"), columna("seguro"),
+                                     tasas if tasa_descuento_anual is None else tasa_descuento_anual)
+        for j, i in enumerate(cerrados):
+            filas[i] = {clave: valores if valores is None else valores[j].item()
+                        for clave, valores in vector.items()}
+            if np.isnan(filas[i]["TIR (%)"]):
+                filas[i]["TIR (%)"] = None
+
+    for i, esc in enumerate(escenarios):
+        if filas[i] is None:
+            filas[i] = totales_escenario(esc, tasa_descuento_anual)
+
+    return pd.DataFrame(filas, index=pd.Index([esc.get("nombre") for esc in escenarios],
+                                              name="Escenario"))
+
+
+# =========================
+# Ayudantes privados
+# =========================
+
+def _forma_cerrada(parametros: dict) -> bool:
+    """Francés, en pesos y sin aportes: basta ``totales_sin_aportes``."""
+    return ((parametros.get("sistema") or SISTEMA_POR_DEFECTO) == "frances"
+            and not es_uvr(parametros)
+            and not normalizar_aportes(dict(parametros)))
@@ -0,0 +1,182 @@
+# modules/uvr.py
+"""Serie de la UVR (Unidad de Valor Real) para créditos indexados a inflación.
+
+Un crédito en UVR se amortiza en unidades: saldo y cuota se calculan en UVR
+con la tasa real del crédito y se convierten a pesos con el valor de la UVR
+de cada fecha.  La serie se lee de un archivo local (CSV, ``;`` o ``,``):
+
+* UVR diaria   – columnas ``fecha`` y ``uvr`` (o ``valor``).
+* Inflación    – columnas ``fecha`` (un día cualquiera del mes) e
+  ``inflacion``: variación mensual del IPC en decimal.  La UVR diaria se
+  construye con la metodología del Banco de la República: del 16 de un mes
+  al 15 del siguiente crece geométricamente con la inflación del mes
+  calendario anterior, partiendo de ``uvr_inicial`` en el primer día 15.
+
+Las fechas posteriores al final de la serie se proyectan con una inflación
+anual constante (``inflacion_proyectada``).
+
+La conversión no busca fecha por fecha: ``SerieUVR`` guarda un arreglo denso
+con un valor por día calendario, de modo que el factor de cualquier arreglo
+de fechas es ``valores[fechas - inicio]``.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from modules.dates import fecha_desembolso
+
+_COLUMNAS_UVR = ("uvr", "valor")
+_COLUMNAS_INFLACION = ("inflacion", "inflación", "variacion", "variación")
+_DIAS_ANIO = 365.0
+
+
+class SerieUVR:
+    """Valor diario de la UVR con búsqueda vectorizada por fecha."""
+
+    __slots__ = ("inicio", "valores", "inflacion_proyectada")
+
+    def __init__(self, fechas, valores, inflacion_proyectada: Optional[float] = None):
+        fechas = np.asarray(fechas, dtype="datetime64[D]")
+        valores = np.asarray(valores, dtype=float)
+        if fechas.size == 0:
+            raise ValueError("La serie UVR está vacía.")
+        orden = np.argsort(fechas, kind="stable")
+        fechas, valores = fechas[orden], valores[orden]
+
+        # Índice denso fecha → valor: un elemento por día calendario.  Los días
+        # sin dato (fines de semana en algunas fuentes) toman el último valor.
+        self.inicio = fechas[0]
+        posiciones = (fechas - self.inicio).astype(np.int64)
+        ultimo = np.full(int(posiciones[-1]) + 1, -1, dtype=np.int64)
+        ultimo[posiciones] = np.arange(posiciones.size)
+        self.valores = valores[np.maximum.accumulate(ultimo)]
+        self.inflacion_proyectada = inflacion_proyectada
+
+    @classmethod
+    def proyectada(cls, fecha_inicial, inflacion_anual: float,
+                   uvr_inicial: float = 1.0) -> "SerieUVR":
+        """Serie sin historia: ``uvr_inicial`` en ``fecha_inicial`` y luego
+        crecimiento con ``inflacion_anual`` constante."""
+        fecha = np.datetime64(pd.Timestamp(fecha_inicial).date(), "D")
+        return cls([fecha], [uvr_inicial], inflacion_proyectada=inflacion_anual)
+
+    @property
+    def fin(self) -> np.datetime64:
+        return self.inicio + (self.valores.size - 1)
+
+    def __len__(self) -> int:
+        return self.valores.size
+
+    def __repr__(self) -> str:
+        return (f"SerieUVR({self.inicio} → {self.fin}, "
+                f"inflacion_proyectada={self.inflacion_proyectada})")
+
+    def factores(self, fechas) -> np.ndarray:
+        """Valor de la UVR en cada fecha (arreglo de cualquier forma)."""
+        fechas = np.asarray(fechas, dtype="datetime64[D]")
+        dias = (fechas - self.inicio).astype(np.int64)
+        if dias.size and dias.min() < 0:
+            raise ValueError(f"La serie UVR empieza el {self.inicio}; no cubre {fechas.min()}.")
+
+        ultimo = self.valores.size - 1
+        futuro = dias > ultimo
+        if not futuro.any():
+            return self.valores[dias]
+        if self.inflacion_proyectada is None:
+            raise ValueError(
+                f"La serie UVR termina el {self.fin} y no cubre {fechas.max()}; "
+                "indique 'inflacion' para proyectarla.")
+
+        resultado = self.valores[np.minimum(dias, ultimo)]
+        exceso = (dias[futuro] - ultimo) / _DIAS_ANIO
+        resultado[futuro] = self.valores[ultimo] * (1.0 + self.inflacion_proyectada) ** exceso
+        return resultado
+
+
+def uvr_desde_inflacion(meses, inflacion_mensual, uvr_inicial: float = 1.0) -> SerieUVR:
+    """UVR diaria a partir de la variación mensual del IPC (metodología BanRep).
+
+    ``inflacion_mensual[k]`` es la variación del mes ``meses[k]`` y rige el
+    período del 16 del mes siguiente al 15 del subsiguiente:
+    ``UVR_t = UVR_15 · (1 + i)^(t/d)``, con ``t`` los días transcurridos desde
+    el 15 y ``d`` los días del período.
+    """
+    meses = np.unique(np.asarray(meses, dtype="datetime64[M]"), return_index=True)
+    inflacion = np.asarray(inflacion_mensual, dtype=float)[meses[1]]
+    meses = meses[0]
+    if np.any(np.diff(meses).astype(int) != 1):
+        raise ValueError("La serie de inflación debe tener meses consecutivos.")
+
+    anclas = (meses + 1).astype("datetime64[D]") + 14      # día 15 del mes siguiente
+    cierres = (meses + 2).astype("datetime64[D]") + 14
+    valores_ancla = uvr_inicial * np.concatenate(([1.0], np.cumprod(1.0 + inflacion)[:-1]))
+
+    dias = np.arange(anclas[0], cierres[-1] + 1)
+    periodo = np.searchsorted(anclas, dias, side="right") - 1
+    periodo = np.minimum(periodo, meses.size - 1)
+    transcurridos = (dias - anclas[periodo]).astype(float)
+    duracion = (cierres[periodo] - anclas[periodo]).astype(float)
+    valores = valores_ancla[periodo] * (1.0 + inflacion[periodo]) ** (transcurridos / duracion)
+    return SerieUVR(dias, valores)
+
+
+def cargar_serie_uvr(ruta: str | Path, inflacion_proyectada: Optional[float] = None,
+                     uvr_inicial: float = 1.0) -> SerieUVR:
+    """Lee la serie local (UVR diaria o inflación mensual); se guarda en caché."""
+    return _cargar_serie(str(Path(ruta).resolve()), inflacion_proyectada, float(uvr_inicial))
+
+
+def serie_de_escenario(parametros: dict) -> SerieUVR:
+    """Serie a usar para un escenario en UVR.
+
+    Claves del escenario: ``serie_uvr`` (ruta o ``SerieUVR``), ``inflacion``
+    (EA en decimal, para proyectar) y ``uvr_inicial``.  Sin archivo, la serie
+    se proyecta desde el desembolso; las unidades quedan entonces relativas a
+    ``uvr_inicial`` pero los valores en pesos no cambian.
+    """
+    serie = parametros.get("serie_uvr")
+    inflacion = parametros.get("inflacion")
+    if isinstance(serie, SerieUVR):
+        return serie
+    if serie:
+        return cargar_serie_uvr(serie, inflacion, parametros.get("uvr_inicial", 1.0))
+    if inflacion is None:
+        raise ValueError("Un crédito en UVR necesita 'serie_uvr' o 'inflacion'.")
+    desembolso = fecha_desembolso(parametros["fecha_inicio"], parametros.get("regla_fecha", "mismo_dia"))
+    return _serie_proyectada(desembolso, float(inflacion), float(parametros.get("uvr_inicial", 1.0)))
+
+
+# =========================
+# Ayudantes privados
+# =========================
+
+@lru_cache(maxsize=8)
+def _cargar_serie(ruta: str, inflacion_proyectada: Optional[float],
+                  uvr_inicial: float) -> SerieUVR:
+    tabla = pd.read_csv(ruta, sep=None, engine="python")
+    tabla.columns = [str(c).strip().lower() for c in tabla.columns]
+    if "fecha" not in tabla.columns:
+        raise ValueError(f"{ruta}: falta la columna 'fecha'.")
+    fechas = pd.to_datetime(tabla["fecha"]).to_numpy(dtype="datetime64[D]")
+
+    columna_uvr = next((c for c in _COLUMNAS_UVR if c in tabla.columns), None)
+    if columna_uvr is not None:
+        serie = SerieUVR(fechas, tabla[columna_uvr].to_numpy(dtype=float))
+    else:
+        columna = next((c for c in _COLUMNAS_INFLACION if c in tabla.columns), None)
+        if columna is None:
+            raise ValueError(f"{ruta}: se esperaba una columna 'uvr' o 'inflacion'.")
+        serie = uvr_desde_inflacion(fechas, tabla[columna].to_numpy(dtype=float), uvr_inicial)
+    serie.inflacion_proyectada = inflacion_proyectada
+    return serie
+
+
+@lru_cache(maxsize=64)
+def _serie_proyectada(fecha: np.datetime64, inflacion: float, uvr_inicial: float) -> SerieUVR:
+    return SerieUVR.proyectada(fecha, inflacion, uvr_inicial)
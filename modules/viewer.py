@@ -0,0 +1,71 @@
+# modules/viewer.py
+"""Vista por páginas de la tabla de amortización.
+
+La tabla completa puede tener cientos de filas y en pantalla se ve solo una
+parte.  En vez de copiar y formatear todo el DataFrame, aquí se corta la
+página visible y sus columnas de dinero se redondean hacia arriba y se pasan
+a texto ``$ 1.234.567`` (puntos de miles, como el resto de la pantalla) en
+una sola pasada sobre todas esas celdas.  ``st.column_config`` no ofrece el punto como
+separador, por eso el texto se arma aquí.  Las páginas se guardan en
+``CacheEscenarios`` (ver ``CacheEscenarios.pagina``).
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List
+
+import numpy as np
+import pandas as pd
+
+FILAS_POR_PAGINA = 60
+
+
+def columnas_dinero(columnas: Iterable[str]) -> List[str]:
+    """Columnas que se muestran redondeadas hacia arriba y sin decimales."""
+    return [col for col in columnas
+            if "$" in col or "Cuota Total" in col or "Valor de Cuota" in col]
+
+
+def numero_paginas(filas: int, filas_por_pagina: int = FILAS_POR_PAGINA) -> int:
+    return max(1, -(-filas // filas_por_pagina))
+
+
+def pagina_tabla(tabla: pd.DataFrame, pagina: int,
+                 filas_por_pagina: int = FILAS_POR_PAGINA) -> pd.DataFrame:
+    """Filas de la página ``pagina`` (desde 1) con el dinero redondeado hacia
+    arriba y como texto ``$ 1.234.567``.
+
+    Los textos vacíos de «Aporte ($)» y «Nueva Cuota ($)» siguen vacíos.
+    """
+    inicio = (pagina - 1) * filas_por_pagina
+    trozo = tabla.iloc[inicio:inicio + filas_por_pagina]
+    dinero = columnas_dinero(trozo.columns)
+    redondeado = np.ceil(trozo[dinero].apply(pd.to_numeric, errors="coerce"))
+    # Todas las celdas de dinero en una sola serie: el costo fijo de cada
+    # operación de texto de pandas se paga una vez y no una por columna.
+    plano = texto_dinero(pd.Series(redondeado.to_numpy(dtype=float).ravel()))
+    bloque = plano.to_numpy().reshape(redondeado.shape)
+    return trozo.assign(**{col: bloque[:, i] for i, col in enumerate(dinero)})
+
+
+def texto_dinero(valores: pd.Series) -> pd.Series:
+    """``$ 1.234.567`` para valores enteros; NaN queda como texto vacío."""
+    validos = valores.notna()
+    enteros = valores[validos].astype("int64")
+    cifras = enteros.abs().astype(str).str.replace(r"\B(?=(\d{3})+$)", ".", regex=True)
+    signo = np.where(enteros < 0, "-", "")
+    texto = np.full(len(valores), "", dtype=object)
+    texto[validos.to_numpy()] = ("$ " + signo + cifras).to_numpy()
+    return pd.Series(texto, index=valores.index)
+
+
+def pasos_iniciales(tabla: pd.DataFrame, meses: int = 10) -> pd.DataFrame:
+    """Desglose de los primeros meses: saldo inicial, interés, amortización y cuota."""
+    primeras = tabla.head(meses)
+    return pd.DataFrame({
+        "Mes": primeras["Mes"],
+        "Saldo inicial": (primeras["Saldo ($)"] + primeras["Amortización ($)"]).round(2),
+        "Interés": primeras["Interés ($)"],
+        "Amortización": primeras["Amortización ($)"],
+        "Cuota": primeras["Cuota ($)"],
+    }).reset_index(drop=True)